@@ -0,0 +1,146 @@
+"""
+Cubul de agregare pentru pagina "Functii de grup".
+
+Pentru fiecare variabilă categorică se calculează o singură dată agregatele parțiale per grup
+(count, sum, suma pătratelor, min, max) ale tuturor coloanelor numerice. Parțialele se pot combina
+(merge) între bucăți de date, iar media și deviația standard se obțin din ele în O(grupuri).
+Mediana vine din valorile sortate per grup, calculate o singură dată per coloană.
+Rezultatul fiecărei selecții (variabilă, coloane, funcții) este păstrat în memorie.
+"""
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+AGG_FUNCS = ['mean', 'std', 'min', 'max', 'median', 'count']
+
+
+@dataclass
+class GroupPartials:
+    """Agregatele parțiale per grup (index) și coloană; sumsq este calculată față de `shift`."""
+    count: pd.DataFrame
+    sum: pd.DataFrame
+    sumsq: pd.DataFrame
+    min: pd.DataFrame
+    max: pd.DataFrame
+    shift: pd.Series  # valoare de referință per coloană, evită pierderea de precizie la valori mari
+
+    @classmethod
+    def from_frame(cls, keys, values, shift=None):
+        """Parțialele pentru o bucată de date: `keys` este variabila de grupare, `values` coloanele numerice."""
+        if shift is None:
+            shift = values.mean()
+        grouped = values.groupby(keys, observed=True)
+        stats = grouped.agg(['count', 'sum', 'min', 'max'])
+        sumsq = (values - shift).pow(2).groupby(keys, observed=True).sum()
+        return cls(stats.xs('count', axis=1, level=1), stats.xs('sum', axis=1, level=1), sumsq,
+                   stats.xs('min', axis=1, level=1), stats.xs('max', axis=1, level=1), shift)
+
+    def merge(self, other):
+        """Combină parțialele a două bucăți de date (cu același `shift`)."""
+        if not self.shift.equals(other.shift):
+            raise ValueError("Parțialele trebuie calculate față de aceeași valoare de referință (shift)")
+        add = lambda a, b: a.add(b, fill_value=0)
+        return GroupPartials(add(self.count, other.count), add(self.sum, other.sum),
+                             add(self.sumsq, other.sumsq), self.min.combine(other.min, np.fmin),
+                             self.max.combine(other.max, np.fmax), self.shift)
+
+    def mean(self):
+        return self.sum / self.count
+
+    def std(self, ddof=1):
+        # Σ(x - s)² - n·(x̄ - s)² = Σ(x - x̄)²
+        centered_sum = self.sum - self.count * self.shift
+        ss = self.sumsq - centered_sum ** 2 / self.count
+        return np.sqrt(ss.clip(lower=0) / (self.count - ddof).where(self.count > ddof))
+
+
+def _sorted_groups(codes, values, n_groups):
+    """Valorile nenule sortate după (grup, valoare) și pozițiile de început ale fiecărui grup."""
+    valid = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[valid], values[valid]
+    order = np.lexsort((values, codes))
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+    return values[order], starts, counts
+
+
+def _group_medians(sorted_values, starts, counts):
+    medians = np.full(len(counts), np.nan)
+    present = counts > 0
+    low = starts[present] + (counts[present] - 1) // 2
+    high = starts[present] + counts[present] // 2
+    medians[present] = (sorted_values[low] + sorted_values[high]) / 2
+    return medians
+
+
+class AggregationCube:
+    """Agregări de grup pe `df`, construite din parțiale precalculate per variabilă categorică."""
+
+    def __init__(self, df, categorical_cols, numeric_cols):
+        self.df = df
+        self.categorical_cols = list(categorical_cols)
+        self.numeric_cols = list(numeric_cols)
+        self._partials = {}
+        self._codes = {}
+        self._medians = {}
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def _group_codes(self, cat):
+        if cat not in self._codes:
+            self._codes[cat] = pd.factorize(self.df[cat], sort=True)
+        return self._codes[cat]
+
+    def partials(self, cat):
+        """Parțialele pentru toate coloanele numerice, grupate după `cat` (calculate o singură dată)."""
+        with self._lock:
+            if cat not in self._partials:
+                codes, uniques = self._group_codes(cat)
+                keys = pd.Series(codes, index=self.df.index).where(codes >= 0)
+                partials = GroupPartials.from_frame(keys, self.df[self.numeric_cols])
+                index = pd.Index(uniques, name=cat)
+                for name in ('count', 'sum', 'sumsq', 'min', 'max'):
+                    frame = getattr(partials, name)
+                    frame.index = index[frame.index.astype(int)]
+                self._partials[cat] = partials
+            return self._partials[cat]
+
+    def median(self, cat, col):
+        """Mediana lui `col` pe grupurile lui `cat`, din valorile sortate per grup."""
+        with self._lock:
+            key = (cat, col)
+            if key not in self._medians:
+                codes, uniques = self._group_codes(cat)
+                values = self.df[col].to_numpy(dtype=np.float64)
+                medians = _group_medians(*_sorted_groups(codes, values, len(uniques)))
+                self._medians[key] = pd.Series(medians, index=pd.Index(uniques, name=cat))
+            return self._medians[key]
+
+    def aggregate(self, cat, cols, funcs):
+        """Echivalentul lui df.groupby(cat)[cols].agg(funcs), servit din parțiale."""
+        key = (cat, tuple(cols), tuple(funcs))
+        with self._lock:
+            if key in self._results:
+                return self._results[key]
+
+        partials = self.partials(cat)
+        derived = {
+            'mean': partials.mean,
+            'std': partials.std,
+            'min': lambda: partials.min,
+            'max': lambda: partials.max,
+            'count': lambda: partials.count.astype('int64'),
+        }
+        tables = {func: derived[func]() for func in funcs if func != 'median'}
+        columns = {}
+        for col in cols:
+            for func in funcs:
+                columns[(col, func)] = self.median(cat, col) if func == 'median' else tables[func][col]
+        result = pd.DataFrame(columns)
+        result.index.name = cat
+
+        with self._lock:
+            self._results[key] = result
+        return result
@@ -0,0 +1,72 @@
+"""
+Tabela de legătură piesă <-> artist.
+
+Coloana 'artist(s)_name' conține mai mulți artiști separați prin virgulă. În loc să o
+despărțim la fiecare utilizare (cu ', ' într-un loc și ',' în altul), o "explodăm" o singură
+dată într-o tabelă cu câte un rând per (piesă, artist) și un ID întreg pentru fiecare artist.
+Maparea țărilor, detectarea colaborărilor și frecvența artiștilor devin simple join-uri/grupări.
+"""
+import pandas as pd
+
+ARTIST_COLUMN = 'artist(s)_name'
+
+
+def build_artist_index(df):
+    """
+    Returnează tabela de legătură cu coloanele:
+    track_id (poziția piesei în df), artist_id (întreg), artist_name, position (ordinea artistului pe piesă).
+    """
+    names = (
+        df[ARTIST_COLUMN].reset_index(drop=True)
+        .str.split(',')
+        .explode()
+        .str.strip()
+    )
+    names = names[names.notna() & (names != '')]
+    bridge = pd.DataFrame({'track_id': names.index.to_numpy(), 'artist_name': names.to_numpy()})
+    bridge['artist_id'], _ = pd.factorize(bridge['artist_name'])
+    bridge['position'] = bridge.groupby('track_id').cumcount()
+    return bridge[['track_id', 'artist_id', 'artist_name', 'position']]
+
+
+def artists_table(bridge):
+    """Un rând per artist: artist_id, artist_name."""
+    return bridge[['artist_id', 'artist_name']].drop_duplicates('artist_id').reset_index(drop=True)
+
+
+def artist_frequencies(bridge):
+    """Numărul de piese (solo + colaborări) pentru fiecare artist, descrescător."""
+    return (
+        bridge.groupby(['artist_id', 'artist_name']).size()
+        .rename('artist_total_count')
+        .reset_index()
+        .sort_values('artist_total_count', ascending=False, kind='stable')
+        .reset_index(drop=True)
+    )
+
+
+def artists_per_track(bridge):
+    """Numărul de artiști per piesă (Series indexată după track_id)."""
+    return bridge.groupby('track_id').size()
+
+
+def collab_flags(bridge):
+    """True pentru piesele cu mai mulți artiști (Series indexată după track_id)."""
+    return artists_per_track(bridge) > 1
+
+
+def country_lists(bridge, artist_country, n_tracks, unknown='Unknown'):
+    """
+    Lista de țări unice și sortate ("A, B") pentru fiecare piesă, ca Series indexată după track_id.
+    artist_country: Series artist_name -> țară.
+    """
+    countries = bridge[['track_id', 'artist_name']].copy()
+    countries['country'] = countries['artist_name'].map(artist_country).fillna(unknown)
+    result = (
+        countries[['track_id', 'country']]
+        .drop_duplicates()
+        .sort_values(['track_id', 'country'])
+        .groupby('track_id')['country']
+        .agg(', '.join)
+    )
+    return result.reindex(range(n_tracks), fill_value=unknown)
@@ -0,0 +1,143 @@
+"""
+Benchmark pentru modelele de predicție a numărului de streamuri.
+
+Compară, pe același set de caracteristici (features.FEATURE_COLS, scalat) și aceeași împărțire
+train/test, regresia liniară (OLS), ridge, lasso și gradient boosting pe histograme, fiecare și
+în varianta cu ținta logaritmată (streams_log = log1p(streams), ca în pagina NA_and_Outliers).
+Pentru fiecare model se măsoară timpul de antrenare, latența predicției, memoria (vârful alocărilor
+în timpul antrenării și dimensiunea modelului serializat) și MAE/R² pe scara originală a streamurilor.
+Rezultatele sunt salvate în JSON, împreună cu hash-ul datelor pe care au fost obținute.
+
+Utilizare:
+    python benchmark.py                  # toate modelele
+    python benchmark.py ridge hgb_log    # doar modelele date
+"""
+import argparse
+import json
+import os
+import pickle
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import TransformedTargetRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.linear_model import Lasso, LinearRegression, Ridge
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import train_test_split
+
+from data_loader import load_dataset
+from features import FEATURE_COLS, dataset_hash, get_feature_matrix
+
+RESULTS_FILE = "data/models/benchmark.json"
+DATA_CSV = "data/data_with_encoding.csv"
+LATENCY_ROWS = 200  # numărul de predicții pe câte un singur rând pentru latența per cerere
+
+
+def _log_target(regressor):
+    # Antrenare pe log1p(streams); predicțiile sunt readuse pe scara originală cu expm1
+    return TransformedTargetRegressor(regressor=regressor, func=np.log1p, inverse_func=np.expm1)
+
+
+BENCHMARK_MODELS = {
+    'ols': lambda: LinearRegression(),
+    'ridge': lambda: Ridge(alpha=1.0),
+    'lasso': lambda: Lasso(alpha=1.0, max_iter=10_000),
+    'hgb': lambda: HistGradientBoostingRegressor(random_state=42),
+    'ols_log': lambda: _log_target(LinearRegression()),
+    'ridge_log': lambda: _log_target(Ridge(alpha=1.0)),
+    'lasso_log': lambda: _log_target(Lasso(alpha=0.001, max_iter=10_000)),
+    'hgb_log': lambda: _log_target(HistGradientBoostingRegressor(random_state=42)),
+}
+
+
+def _benchmark_one(name, model, X_train, X_test, y_train, y_test):
+    tracemalloc.start()
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    batch_seconds = time.perf_counter() - start
+
+    single_rows = X_test[:LATENCY_ROWS]
+    timings = []
+    for i in range(len(single_rows)):
+        start = time.perf_counter()
+        model.predict(single_rows[i:i + 1])
+        timings.append(time.perf_counter() - start)
+
+    return {
+        'model': name,
+        'fit_s': fit_seconds,
+        'predict_batch_ms': batch_seconds * 1000,
+        'predict_row_us': float(np.median(timings)) * 1e6 if timings else float('nan'),
+        'fit_peak_mb': peak_bytes / 2**20,
+        'model_kb': len(pickle.dumps(model)) / 1024,
+        'mae': float(mean_absolute_error(y_test, y_pred)),
+        'r2': float(r2_score(y_test, y_pred)),
+    }
+
+
+def benchmark_models(X, y, models=None, test_size=0.2, random_state=42):
+    """Antrenează și evaluează fiecare model din `models` (implicit toate); returnează tabelul comparativ."""
+    names = list(models or BENCHMARK_MODELS)
+    unknown = [name for name in names if name not in BENCHMARK_MODELS]
+    if unknown:
+        raise ValueError(f"Modele necunoscute: {', '.join(unknown)}")
+
+    X = np.asarray(X)
+    y = np.asarray(y, dtype=np.float64)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=random_state)
+    rows = [_benchmark_one(name, BENCHMARK_MODELS[name](), X_train, X_test, y_train, y_test) for name in names]
+    return pd.DataFrame(rows).set_index('model').sort_values('mae')
+
+
+def save_results(results, data_hash, path=RESULTS_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = {
+        'data_hash': data_hash,
+        'created_at': time.time(),
+        'results': results.reset_index().to_dict(orient='records'),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+
+
+def load_results(path=RESULTS_FILE):
+    """Returnează (tabelul, hash-ul datelor) din ultimul benchmark salvat, sau (None, None)."""
+    if not os.path.exists(path):
+        return None, None
+    with open(path, encoding="utf-8") as f:
+        payload = json.load(f)
+    return pd.DataFrame(payload['results']).set_index('model'), payload.get('data_hash')
+
+
+def run_benchmark(df, models=None, path=RESULTS_FILE):
+    """Benchmark pe rândurile complete din `df`, cu matricea de caracteristici partajată; salvează rezultatele."""
+    df = df.dropna(subset=FEATURE_COLS + ['streams'])
+    features = get_feature_matrix(df, FEATURE_COLS)
+    results = benchmark_models(features.X, df['streams'].to_numpy(), models)
+    save_results(results, dataset_hash(df, FEATURE_COLS + ['streams']), path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark al modelelor de predicție a streamurilor")
+    parser.add_argument("models", nargs="*", help=f"modelele de evaluat ({', '.join(BENCHMARK_MODELS)})")
+    parser.add_argument("--output", default=RESULTS_FILE, help="fișierul JSON cu rezultatele")
+    args = parser.parse_args()
+
+    df = load_dataset(DATA_CSV, columns=FEATURE_COLS + ['streams'])
+    results = run_benchmark(df, args.models or None, args.output)
+    with pd.option_context('display.width', 120):
+        print(results.round(4))
+    print(f"Rezultate salvate în {args.output}")
+
+
+if __name__ == "__main__":
+    main()
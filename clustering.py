@@ -0,0 +1,290 @@
+"""
+Cache pentru modelele de clusterizare folosite în pagina "Scalare si clusterizare".
+
+Datele scalate vin din features.get_feature_matrix (partajate cu paginile de regresie), iar
+proiecția PCA depinde doar de ele, deci se calculează o singură dată. Modelele KMeans sunt
+păstrate per număr de clustere k.
+Cheia fiecărui model este (hash-ul datelor, lista de coloane, k); modelele sunt salvate pe disc
+cu joblib, astfel încât și o pornire la rece a aplicației le refolosește.
+
+Pentru cataloage mari există și un mod streaming (MiniBatchKMeans cu partial_fit), care citește
+setul de date în bucăți și nu îl ține niciodată în memorie în întregime.
+
+sweep_k evaluează în paralel mai multe valori ale lui k (inerție, silhouette, Davies–Bouldin,
+Calinski–Harabasz), pentru graficele elbow/silhouette din pagină.
+
+Proiecția 2D folosește PCA cu SVD randomizat pentru seturi mari și IncrementalPCA în modul
+streaming; componentele rămân în cache, iar rândurile noi se proiectează fără reantrenare.
+"""
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+
+import joblib
+from joblib import Parallel, delayed
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.decomposition import PCA, IncrementalPCA
+from sklearn.metrics import calinski_harabasz_score, davies_bouldin_score, silhouette_score
+from sklearn.preprocessing import StandardScaler
+
+MODELS_DIR = "data/models/clustering"
+K_RANGE = range(2, 11)
+STREAMING_ROW_THRESHOLD = 200_000  # peste acest număr de rânduri pagina folosește modul streaming
+PCA_RANDOMIZED_ROWS = 10_000  # peste acest număr de rânduri PCA folosește SVD randomizat
+MAX_PLOT_POINTS = 20_000  # numărul maxim de puncte desenate în graficul PCA
+SWEEP_SAMPLE_ROWS = 50_000  # rândurile eșantionului pe care se face sweep_k în modul streaming
+
+
+def _features_hash(features):
+    return hashlib.sha256(",".join(features).encode("utf-8")).hexdigest()[:8]
+
+
+@dataclass
+class Projection:
+    """Partea comună tuturor valorilor lui k: scaler-ul și proiecția PCA 2D."""
+    scaler: StandardScaler
+    pca: object  # PCA sau IncrementalPCA
+    X_pca: np.ndarray
+
+    def transform(self, X_new):
+        """Proiectează rânduri noi cu componentele deja calculate (fără reantrenare)."""
+        # np.array face o copie: scaler-ul din features scalează pe loc (copy=False)
+        return self.pca.transform(self.scaler.transform(np.array(X_new, dtype=np.float64)))
+
+
+def fit_incremental_projection(chunks, scaler, n_components=2):
+    """Proiecție PCA pe bucăți (IncrementalPCA), cu un scaler deja antrenat (ex. cel din modul streaming)."""
+    ipca = IncrementalPCA(n_components=n_components)
+    for chunk in chunks():
+        # partial_fit cere cel puțin n_components rânduri per apel
+        if len(chunk) >= n_components:
+            ipca.partial_fit(scaler.transform(chunk.to_numpy(dtype=np.float64)))
+    X_pca = [ipca.transform(scaler.transform(chunk.to_numpy(dtype=np.float64))).astype(np.float32)
+             for chunk in chunks()]
+    X_pca = np.concatenate(X_pca) if X_pca else np.empty((0, n_components), dtype=np.float32)
+    return Projection(scaler, ipca, X_pca)
+
+
+def stratified_sample(labels, max_points=MAX_PLOT_POINTS, random_state=42):
+    """
+    Indicii unui eșantion de cel mult `max_points` rânduri, cu aceleași proporții ale clusterelor
+    ca în datele complete (fiecare cluster păstrează cel puțin un punct).
+    """
+    labels = np.asarray(labels)
+    if len(labels) <= max_points:
+        return np.arange(len(labels))
+    rng = np.random.default_rng(random_state)
+    fraction = max_points / len(labels)
+    indices = []
+    for cluster_id in np.unique(labels):
+        members = np.flatnonzero(labels == cluster_id)
+        size = max(1, int(round(len(members) * fraction)))
+        indices.append(rng.choice(members, size=size, replace=False))
+    return np.sort(np.concatenate(indices))
+
+
+@dataclass
+class ClusteringResult:
+    kmeans: KMeans
+    labels: np.ndarray
+    centers: np.ndarray
+    inertia: float
+
+
+@dataclass
+class StreamingClusteringResult:
+    scaler: StandardScaler
+    kmeans: MiniBatchKMeans
+    labels: np.ndarray
+    centers: np.ndarray
+    inertia: float
+    inertia_history: list
+    n_epochs: int
+    converged: bool
+
+
+def fit_streaming_kmeans(chunks, k, max_epochs=10, tol=1e-3, batch_size=4096, random_state=42):
+    """
+    KMeans pe date care nu încap în memorie. `chunks` este o funcție care returnează, la fiecare apel,
+    un iterator nou peste bucățile setului de date (ex. lambda: iter_chunks(path, coloane)).
+
+    1. o trecere pentru StandardScaler.partial_fit;
+    2. epoci de MiniBatchKMeans.partial_fit; inerția fiecărei epoci este estimată din loturile
+       văzute (scorate înainte de actualizare), iar antrenarea se oprește când variația relativă < tol;
+    3. o trecere finală de atribuire a clusterelor și de calcul al inerției exacte.
+    """
+    if max_epochs < 1:
+        raise ValueError("max_epochs trebuie să fie cel puțin 1")
+    scaler = StandardScaler()
+    for chunk in chunks():
+        scaler.partial_fit(chunk.to_numpy(dtype=np.float64))
+
+    kmeans = MiniBatchKMeans(n_clusters=k, batch_size=batch_size, random_state=random_state, n_init=3)
+    inertia_history = []
+    converged = False
+    fitted = False
+    for epoch in range(max_epochs):
+        epoch_inertia = 0.0
+        for chunk in chunks():
+            X_chunk = scaler.transform(chunk.to_numpy(dtype=np.float64))
+            for start in range(0, len(X_chunk), batch_size):
+                batch = X_chunk[start:start + batch_size]
+                if fitted:
+                    epoch_inertia += -kmeans.score(batch)
+                kmeans.partial_fit(batch)
+                fitted = True
+        if epoch > 0:
+            inertia_history.append(epoch_inertia)
+        if len(inertia_history) >= 2:
+            previous, current = inertia_history[-2], inertia_history[-1]
+            if abs(previous - current) <= tol * max(previous, 1e-12):
+                converged = True
+                break
+
+    labels = []
+    inertia = 0.0
+    for chunk in chunks():
+        X_chunk = scaler.transform(chunk.to_numpy(dtype=np.float64))
+        labels.append(kmeans.predict(X_chunk).astype(np.int32))
+        inertia += -kmeans.score(X_chunk)
+    labels = np.concatenate(labels) if labels else np.empty(0, dtype=np.int32)
+
+    return StreamingClusteringResult(scaler, kmeans, labels, kmeans.cluster_centers_, inertia,
+                                     inertia_history, epoch + 1, converged)
+
+
+def _evaluate_k(X, k, random_state, silhouette_sample):
+    kmeans = KMeans(n_clusters=k, random_state=random_state)
+    labels = kmeans.fit_predict(X)
+    # Silhouette exact e O(n²): îl calculăm pe un eșantion; sklearn procesează distanțele pe bucăți
+    sample_size = silhouette_sample if len(X) > silhouette_sample else None
+    return {
+        'k': k,
+        'inertia': float(kmeans.inertia_),
+        'silhouette': float(silhouette_score(X, labels, sample_size=sample_size, random_state=random_state)),
+        'davies_bouldin': float(davies_bouldin_score(X, labels)),
+        'calinski_harabasz': float(calinski_harabasz_score(X, labels)),
+    }
+
+
+def sweep_k(X, ks=K_RANGE, n_jobs=-1, silhouette_sample=10_000, max_fit_rows=STREAMING_ROW_THRESHOLD,
+            random_state=42):
+    """
+    Evaluează KMeans pentru fiecare k din `ks`, în paralel pe procese (joblib).
+    Pentru seturi foarte mari, modelele se antrenează pe un eșantion de cel mult `max_fit_rows` rânduri.
+    Returnează un DataFrame cu o linie per k.
+    """
+    X = np.asarray(X)
+    if len(X) > max_fit_rows:
+        rng = np.random.default_rng(random_state)
+        X = X[rng.choice(len(X), size=max_fit_rows, replace=False)]
+    rows = Parallel(n_jobs=n_jobs)(
+        delayed(_evaluate_k)(X, k, random_state, silhouette_sample) for k in ks
+    )
+    return pd.DataFrame(rows).set_index('k')
+
+
+class KMeansModelStore:
+    """Modele KMeans în memorie și pe disc, cu precalcularea în fundal a valorilor k din K_RANGE."""
+
+    def __init__(self, models_dir=MODELS_DIR, random_state=42):
+        self.models_dir = models_dir
+        self.random_state = random_state
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._background = {}
+
+    def _path(self, data_hash, features, name):
+        return os.path.join(self.models_dir, f"{data_hash}_{_features_hash(features)}_{name}.joblib")
+
+    def _cached(self, key, path, compute):
+        """Caută în memorie, apoi pe disc; altfel calculează și salvează. Un singur calcul per cheie."""
+        with self._lock:
+            if key in self._memory:
+                return self._memory[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            if key in self._memory:
+                return self._memory[key]
+            if os.path.exists(path):
+                value = joblib.load(path)
+            else:
+                value = compute()
+                os.makedirs(self.models_dir, exist_ok=True)
+                joblib.dump(value, path)
+            with self._lock:
+                self._memory[key] = value
+            return value
+
+    def projection(self, fm):
+        """Proiecția PCA 2D a matricei de caracteristici `fm` (features.FeatureMatrix)."""
+        def compute():
+            # SVD randomizat: mult mai rapid decât SVD complet când sunt multe rânduri
+            svd_solver = "randomized" if len(fm.X) > PCA_RANDOMIZED_ROWS else "full"
+            pca = PCA(n_components=2, svd_solver=svd_solver, random_state=self.random_state)
+            X_pca = pca.fit_transform(fm.X)
+            return Projection(fm.scaler, pca, X_pca)
+
+        key = (fm.data_hash, fm.columns, "projection")
+        return self._cached(key, self._path(fm.data_hash, fm.columns, "projection"), compute)
+
+    def streaming_projection(self, chunks, data_hash, features, scaler):
+        """Varianta streaming a lui projection (IncrementalPCA pe bucăți)."""
+        key = (data_hash, tuple(features), "streaming_projection")
+        return self._cached(key, self._path(data_hash, features, "streaming_projection"),
+                            lambda: fit_incremental_projection(chunks, scaler))
+
+    def get(self, fm, k):
+        """Modelul KMeans pentru k clustere pe matricea `fm` (din cache dacă există)."""
+        def compute():
+            kmeans = KMeans(n_clusters=k, random_state=self.random_state)
+            labels = kmeans.fit_predict(fm.X)
+            return ClusteringResult(kmeans, labels, kmeans.cluster_centers_, float(kmeans.inertia_))
+
+        key = (fm.data_hash, fm.columns, k)
+        return self._cached(key, self._path(fm.data_hash, fm.columns, f"k{k}"), compute)
+
+    def get_streaming(self, chunks, data_hash, features, k):
+        """Varianta streaming a lui get (vezi fit_streaming_kmeans)."""
+        key = (data_hash, tuple(features), "streaming", k)
+        return self._cached(key, self._path(data_hash, features, f"streaming_k{k}"),
+                            lambda: fit_streaming_kmeans(chunks, k, random_state=self.random_state))
+
+    def sweep(self, fm, ks=K_RANGE):
+        """Rezultatele lui sweep_k, păstrate în cache ca orice alt model."""
+        key = (fm.data_hash, fm.columns, "sweep", tuple(ks))
+        name = f"sweep_{min(ks)}_{max(ks)}"
+        return self._cached(key, self._path(fm.data_hash, fm.columns, name),
+                            lambda: sweep_k(fm.X, ks, random_state=self.random_state))
+
+    def streaming_sweep(self, sample, data_hash, features, ks=K_RANGE):
+        """Varianta streaming a lui sweep: sweep_k pe eșantionul de rânduri returnat de `sample()`."""
+        def compute():
+            X = StandardScaler().fit_transform(sample().to_numpy(dtype=np.float64))
+            return sweep_k(X, ks, random_state=self.random_state)
+
+        key = (data_hash, tuple(features), "streaming_sweep", tuple(ks))
+        name = f"streaming_sweep_{min(ks)}_{max(ks)}"
+        return self._cached(key, self._path(data_hash, features, name), compute)
+
+    def precompute(self, fm, ks=K_RANGE):
+        """Antrenează în fundal modelele pentru toate valorile k, ca mutarea slider-ului să fie instantanee."""
+        key = (fm.data_hash, fm.columns)
+        with self._lock:
+            thread = self._background.get(key)
+            if thread is not None and thread.is_alive():
+                return thread
+
+            def work():
+                for k in ks:
+                    self.get(fm, k)
+
+            thread = threading.Thread(target=work, name="kmeans-precompute", daemon=True)
+            self._background[key] = thread
+            thread.start()
+        return thread
@@ -1,92 +1,48 @@
+import os
+
 import pandas as pd
-import requests
-import time
 from tqdm import tqdm
 
-'''
-# Încărcarea datelor
-file_path = "data/spotify-2023.csv"
-df = pd.read_csv(file_path, encoding="ISO-8859-1") #encoding pt a evita probleme cu caractere speciale
-
-# Configurare API Spotify
-CLIENT_ID = "76d61408203b468e9a1b781c6226ccdb"
-CLIENT_SECRET = "86a44efa5bfa4f5784e49b17dff1b3be"
+from spotify_client import ArtistCache, ArtistIdCache, SpotifyClient, enrich_artists_batched
 
-# Obținerea tokenului de acces
-def get_spotify_token():
-    url = "https://accounts.spotify.com/api/token"
-    headers = {"Content-Type": "application/x-www-form-urlencoded"}
-    data = {"grant_type": "client_credentials",
-            "client_id": CLIENT_ID,
-            "client_secret": CLIENT_SECRET}
-    response = requests.post(url, headers=headers, data=data)
-    return response.json().get("access_token")
+# Configurare API Spotify (pot fi suprascrise prin variabile de mediu)
+CLIENT_ID = os.environ.get("SPOTIFY_CLIENT_ID", "76d61408203b468e9a1b781c6226ccdb")
+CLIENT_SECRET = os.environ.get("SPOTIFY_CLIENT_SECRET", "86a44efa5bfa4f5784e49b17dff1b3be")
 
-# Căutare artist în API Spotify
-def get_artist_info(artist_name, token):
-    url = f"https://api.spotify.com/v1/search?q={artist_name}&type=artist&limit=1"
-    headers = {"Authorization": f"Bearer {token}"}
-    response = requests.get(url, headers=headers)
-    data = response.json()
-    if data.get("artists"):
-        items = data["artists"]["items"]
-        if len(items) > 0:
-            artist = items[0]
-            return artist.get("genres", []), artist.get("country", "Unknown")
-    return [], "Unknown"
 
-# Adăugarea genului și țării
-token = get_spotify_token()
-genres_list = []
-countries_list = []
+def enrich_dataset(file_path="data/spotify-2023.csv", output_path="data/spotify-2023-enriched.csv", max_workers=8):
+    """
+    Adaugă genul și țara fiecărui artist folosind API-ul Spotify.
+    Numele sunt rezolvate o singură dată în ID-uri (data/artist_ids.json), iar detaliile se cer în loturi
+    de câte 50; rezultatele sunt păstrate în data/artist_cache.json, deci o nouă rulare interoghează doar artiștii noi.
+    """
+    df = pd.read_csv(file_path, encoding="ISO-8859-1")  # encoding pt a evita probleme cu caractere speciale
 
-for artist in tqdm(df["artist(s)_name"].unique()):
-    genres, country = get_artist_info(artist, token)
-    genres_list.append(", ".join(genres) if genres else "Unknown")
-    countries_list.append(country)
-    time.sleep(0.5)  # Evităm rate limiting
+    client = SpotifyClient(CLIENT_ID, CLIENT_SECRET)
+    cache = ArtistCache()
+    id_cache = ArtistIdCache()
+    artists = df["artist(s)_name"].unique()
+    with tqdm(total=len(artists)) as progress:
+        artist_info = enrich_artists_batched(artists, client, cache, id_cache, max_workers=max_workers,
+                                             progress=progress)
 
-# Crearea unui dicționar pentru mapare
-artist_info = dict(zip(df["artist(s)_name"].unique(), zip(genres_list, countries_list)))
-df["genre"] = df["artist(s)_name"].map(lambda x: artist_info[x][0])
-df["country"] = df["artist(s)_name"].map(lambda x: artist_info[x][1])
+    df["genre"] = df["artist(s)_name"].map(lambda x: ", ".join(artist_info[x][0]) if artist_info[x][0] else "Unknown")
+    df["country"] = df["artist(s)_name"].map(lambda x: artist_info[x][1])
 
-# Salvarea noului fișier
-df.to_csv("data/spotify-2023-enriched.csv", index=False)
+    # Salvarea noului fișier
+    df.to_csv(output_path, index=False)
+    print("Fișierul actualizat a fost salvat!")
 
 
-print("Fișierul actualizat a fost salvat!")
-'''
 df = pd.read_csv("data/spotify-2023-enriched.csv", encoding="ISO-8859-1")
 df = df.drop(columns=['country'])
 df.to_csv("data/spotify-2023-updated.csv", index=False)
 
 print("Ultima coloană 'country' a fost ștearsă și fișierul a fost salvat!")
 
-# df = pd.read_csv("data/data_cleaned_spotify.csv", encoding="ISO-8859-1")
-#
-# # === 1. Artiști solo (fără colaborări) ===
-# solo_df = df[df['artist_count'] == 1].copy()
-# solo_artists = solo_df['artist(s)_name'].str.strip()
-# solo_freq = solo_artists.value_counts()
-#
-# # === 2. Artiști din colaborări ===
-# multi_artist_df = df[df['artist_count'] > 1].copy()
-# multi_artist_df['artist_list'] = multi_artist_df['artist(s)_name'].str.split(',')
-# all_collab_artists = [artist.strip() for sublist in multi_artist_df['artist_list'] for artist in sublist]
-# collab_freq = pd.Series(all_collab_artists).value_counts()
+# Frecvența tuturor artiștilor (solo + colaborări), pe baza tabelei piesă <-> artist:
 #
-# # === 3. Combinăm frecvențele ===
-# combined_freq = solo_freq.add(collab_freq, fill_value=0).astype(int)
-#
-# # === 4. Creăm DataFrame final cu numele și frecvența ===
-# artist_freq_df = pd.DataFrame({
-#     'artist_name': combined_freq.index,
-#     'artist_total_count': combined_freq.values
-# })
-#
-# # === 5. Salvăm rezultatul într-un CSV ===
+# from artist_index import artist_frequencies, build_artist_index
+# df = pd.read_csv("data/data_cleaned_spotify.csv", encoding="utf-8")
+# artist_freq_df = artist_frequencies(build_artist_index(df))[['artist_name', 'artist_total_count']]
 # artist_freq_df.to_csv("data/artists_data.csv", index=False)
-#
-# print("Fișierul complet cu frecvența tuturor artiștilor (solo + colaborări) a fost salvat.")
-
@@ -0,0 +1,186 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+try:
+    import pyarrow.parquet as pq  # necesar doar pentru artefactele Parquet
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+ARTIFACTS_DIR = "data/artifacts"
+
+# Coloanele întregi, curate în toate fișierele din data/ (fără valori lipsă sau separatori de mii)
+INT_COLUMNS = [
+    'artist_count', 'released_year', 'released_month', 'released_day',
+    'in_spotify_playlists', 'in_spotify_charts', 'in_apple_playlists', 'in_apple_charts',
+    'in_deezer_charts', 'bpm', 'danceability_%', 'valence_%', 'energy_%',
+    'acousticness_%', 'instrumentalness_%', 'liveness_%', 'speechiness_%',
+    'key_encoded', 'mode_encoded',
+]
+
+DTYPES = {col: 'int64' for col in INT_COLUMNS}
+
+# Coloane cu puține valori distincte, salvate ca 'category' în artefacte
+CATEGORICAL_COLUMNS = ['key', 'mode']
+
+
+def convert_numeric_columns(df):
+    df['streams'] = df['streams'].astype(str).str.replace(',', '').astype(float)
+    df['in_deezer_playlists'] = df['in_deezer_playlists'].astype(str).str.replace(',', '').astype(int)
+    df['in_shazam_charts'] = pd.to_numeric(df['in_shazam_charts'], errors='coerce')
+    return df
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _read_csv_cached(path, mtime, encoding, convert_numeric, columns=None):
+    # mtime face parte din cheia cache-ului: la modificarea fișierului se recitește automat
+    usecols = (lambda col: col.strip() in columns) if columns else None
+    df = pd.read_csv(path, encoding=encoding, dtype=DTYPES, usecols=usecols)
+    df.columns = df.columns.str.strip()
+    if convert_numeric:
+        convert_numeric_columns(df)
+    return df
+
+
+def load_csv(path, encoding="ISO-8859-1", convert_numeric=False):
+    """
+    Încarcă un CSV din data/ o singură dată per versiune a fișierului (cale + mtime).
+    La rerularea paginii (ex. la mutarea unui slider) datele vin din cache, fără re-parsare.
+    Fiecare apel primește propria copie, deci paginile pot modifica DataFrame-ul liniștit.
+    """
+    mtime = os.path.getmtime(path)
+    return _read_csv_cached(path, mtime, encoding, convert_numeric)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _read_geodata_cached(path, mtime):
+    import geopandas as gpd
+    return gpd.read_file(path)
+
+
+def load_geodata(path):
+    """Citește un shapefile o singură dată per versiune a fișierului (ca load_csv)."""
+    return _read_geodata_cached(path, os.path.getmtime(path))
+
+
+# --- Artefacte columnare (Parquet) ---
+
+def artifact_path(csv_path):
+    """Calea artefactului Parquet corespunzător unui CSV intermediar (data/x.csv -> data/artifacts/x.parquet)."""
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(ARTIFACTS_DIR, f"{name}.parquet")
+
+
+def save_artifact(df, csv_path):
+    """Salvează DataFrame-ul ca Parquet, păstrând tipurile exacte și coloanele categorice."""
+    if not HAS_PYARROW:
+        return None
+    df = df.copy()
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    path = artifact_path(csv_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.to_parquet(path, engine="pyarrow", index=False)
+    return path
+
+
+def _fresh_artifact(csv_path):
+    """Calea artefactului Parquet dacă e utilizabil (există și nu e mai vechi decât CSV-ul), altfel None."""
+    parquet_path = artifact_path(csv_path)
+    if HAS_PYARROW and os.path.exists(parquet_path):
+        if not os.path.exists(csv_path) or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+            return parquet_path
+    return None
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _read_parquet_cached(path, mtime, columns=None):
+    if columns:
+        # Coloanele lipsă sunt ignorate, ca la citirea CSV-ului (paginile își verifică singure coloanele)
+        available = set(pq.read_schema(path).names)
+        columns = [col for col in columns if col in available]
+    # memory_map evită copierea fișierului în memorie înainte de decodare
+    return pd.read_parquet(path, engine="pyarrow", columns=columns, memory_map=True)
+
+
+def load_dataset(csv_path, columns=None, encoding="utf-8"):
+    """
+    Încarcă un set de date intermediar, doar cu coloanele cerute.
+    Folosește artefactul Parquet dacă există și nu e mai vechi decât CSV-ul; altfel citește CSV-ul.
+    """
+    columns = tuple(columns) if columns else None
+    parquet_path = _fresh_artifact(csv_path)
+    if parquet_path:
+        return _read_parquet_cached(parquet_path, os.path.getmtime(parquet_path), columns)
+
+    mtime = os.path.getmtime(csv_path)
+    return _read_csv_cached(csv_path, mtime, encoding, False, columns)
+
+
+def count_rows(csv_path, encoding="utf-8"):
+    """Numărul de rânduri al setului de date, fără a-l încărca (din metadatele Parquet sau numărând liniile)."""
+    parquet_path = _fresh_artifact(csv_path)
+    if parquet_path:
+        return pq.ParquetFile(parquet_path).metadata.num_rows
+    with open(csv_path, encoding=encoding) as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+
+def iter_chunks(csv_path, columns, chunksize=100_000, encoding="utf-8"):
+    """
+    Parcurge setul de date în bucăți de cel mult `chunksize` rânduri, doar cu coloanele cerute.
+    Memoria folosită nu depinde de dimensiunea fișierului.
+    """
+    columns = list(columns)
+    parquet_path = _fresh_artifact(csv_path)
+    if parquet_path:
+        for batch in pq.ParquetFile(parquet_path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()[columns]
+        return
+
+    usecols = lambda col: col.strip() in columns
+    for chunk in pd.read_csv(csv_path, encoding=encoding, dtype=DTYPES, usecols=usecols, chunksize=chunksize):
+        chunk.columns = chunk.columns.str.strip()
+        yield chunk[columns]
+
+
+def take_rows(csv_path, columns, positions, chunksize=100_000, encoding="utf-8"):
+    """
+    Rândurile de pe pozițiile `positions` (crescătoare), doar cu coloanele cerute, citite pe bucăți.
+    Indexul rezultatului este poziția rândului în fișier.
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    parts = []
+    offset = 0
+    for chunk in iter_chunks(csv_path, columns, chunksize, encoding):
+        lo, hi = np.searchsorted(positions, [offset, offset + len(chunk)])
+        if hi > lo:
+            part = chunk.iloc[positions[lo:hi] - offset]
+            part.index = positions[lo:hi]
+            parts.append(part)
+        offset += len(chunk)
+        if hi == len(positions):
+            break  # restul fișierului nu mai conține rânduri cerute
+    return pd.concat(parts) if parts else pd.DataFrame(columns=list(columns))
+
+
+def dataset_version(csv_path):
+    """Identificatorul versiunii setului de date (cale, mtime, dimensiune), fără a-i citi conținutul."""
+    path = _fresh_artifact(csv_path) or csv_path
+    stat = os.stat(path)
+    return hashlib.sha256(f"{os.path.abspath(path)}:{stat.st_mtime}:{stat.st_size}".encode("utf-8")).hexdigest()[:16]
+
+
+def read_sample(csv_path, nrows=1_000, encoding="utf-8"):
+    """Primele `nrows` rânduri, cu toate coloanele (ex. pentru a afla coloanele și tipurile lor)."""
+    parquet_path = _fresh_artifact(csv_path)
+    if parquet_path:
+        return next(pq.ParquetFile(parquet_path).iter_batches(batch_size=nrows)).to_pandas()
+    df = pd.read_csv(csv_path, encoding=encoding, dtype=DTYPES, nrows=nrows)
+    df.columns = df.columns.str.strip()
+    return df
@@ -0,0 +1,67 @@
+"""
+Setul de caracteristici (features) comun paginilor de clusterizare și regresie.
+
+Lista de coloane este definită o singură dată aici. Matricea de design scalată (StandardScaler)
+se construiește o singură dată per versiune a datelor, ca array NumPy float32 contiguu, și este
+partajată (fără copii) de toate paginile care o cer pentru aceleași date.
+"""
+import hashlib
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+FEATURE_COLS = [
+    'bpm', 'key_encoded', 'mode_encoded', 'danceability_%', 'valence_%',
+    'energy_%', 'acousticness_%', 'liveness_%', 'speechiness_%',
+    'in_spotify_playlists', 'in_spotify_charts',
+    'in_apple_playlists', 'in_apple_charts',
+    'in_deezer_playlists', 'in_deezer_charts',
+    'in_shazam_charts', 'genre_freq_encoded', 'country_list_encoded',
+    'released_month', 'released_year', 'released_day', 'artist_count'
+]
+
+
+def dataset_hash(df, columns):
+    """Hash-ul conținutului coloanelor folosite."""
+    values = pd.util.hash_pandas_object(df[list(columns)], index=False).to_numpy()
+    return hashlib.sha256(values.tobytes()).hexdigest()[:16]
+
+
+@dataclass
+class FeatureMatrix:
+    X: np.ndarray  # date scalate, float32, C-contiguu, read-only
+    scaler: StandardScaler
+    columns: tuple
+    data_hash: str
+
+
+MAX_CACHED_MATRICES = 8
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def build_feature_matrix(df, columns=FEATURE_COLS, data_hash=None):
+    """Construiește matricea scalată (float32) și scaler-ul pentru coloanele date."""
+    columns = tuple(columns)
+    X = np.ascontiguousarray(df[list(columns)].to_numpy(dtype=np.float32))
+    scaler = StandardScaler(copy=False)
+    X = scaler.fit_transform(X)  # scalare pe loc, fără o a doua copie a datelor
+    X.flags.writeable = False  # matricea e partajată între pagini, deci nu trebuie modificată
+    return FeatureMatrix(X, scaler, columns, data_hash or dataset_hash(df, columns))
+
+
+def get_feature_matrix(df, columns=FEATURE_COLS):
+    """Matricea pentru aceste date și coloane, din cache dacă a mai fost construită (cheie: hash-ul datelor)."""
+    columns = tuple(columns)
+    data_hash = dataset_hash(df, columns)
+    key = (data_hash, columns)
+    with _lock:
+        if key not in _cache:
+            if len(_cache) >= MAX_CACHED_MATRICES:
+                _cache.pop(next(iter(_cache)))  # eliminăm cea mai veche intrare
+            _cache[key] = build_feature_matrix(df, columns, data_hash)
+        return _cache[key]
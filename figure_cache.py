@@ -0,0 +1,145 @@
+"""
+Cache pentru figurile matplotlib/seaborn ale paginilor.
+
+Fiecare figură este identificată prin numele ei, hash-ul datelor desenate și parametrii graficului;
+imaginea randată (PNG sau SVG) se păstrează pe disc, iar la rerulare pagina afișează direct
+imaginea, fără a mai rula seaborn. Când dimensiunea totală depășește limita, se șterg figurile
+folosite cel mai de demult (LRU, după data ultimei accesări).
+
+FigureBatch adună figurile unei pagini: cele din cache sunt afișate imediat, iar cele lipsă sunt
+desenate la final, în paralel pe fire de execuție. Funcțiile de desenare paralele trebuie să
+construiască figura prin new_figure() (API-ul orientat pe obiecte, fără starea globală pyplot);
+cele care folosesc pyplot (ex. sns.pairplot) se marchează cu uses_pyplot=True și rulează secvențial.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from matplotlib.figure import Figure
+
+from data_loader import ARTIFACTS_DIR
+
+FIGURES_DIR = os.path.join(ARTIFACTS_DIR, "figures")
+MAX_CACHE_BYTES = 200 * 2**20
+MAX_WORKERS = 4
+
+
+def new_figure(figsize):
+    """O figură independentă de pyplot, sigură de desenat în paralel pe mai multe fire."""
+    return Figure(figsize=figsize)
+
+
+class FigureCache:
+    """Imaginile figurilor pe disc, cu evacuare LRU peste `max_bytes`."""
+
+    def __init__(self, cache_dir=FIGURES_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def key(self, name, data_hash, fmt="png", dpi=100, **params):
+        payload = json.dumps({'name': name, 'data': data_hash, 'fmt': fmt, 'dpi': dpi, 'params': params},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+    def _path(self, key, fmt):
+        return os.path.join(self.cache_dir, f"{key}.{fmt}")
+
+    def get(self, key, fmt="png"):
+        path = self._path(key, fmt)
+        try:
+            with open(path, "rb") as f:
+                image = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)  # marchează figura ca folosită recent
+        except FileNotFoundError:
+            pass  # ștearsă între timp de _evict (alt fir); imaginea citită rămâne valabilă
+        return image
+
+    def put(self, key, fig, fmt="png", dpi=100):
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches="tight")
+        image = buffer.getvalue()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(key, fmt)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(image)
+        os.replace(tmp_path, path)  # scriere atomică: alte fire nu văd niciodată un fișier incomplet
+        self._evict()
+        return image
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def render(self, name, data_hash, draw, fmt="png", dpi=100, **params):
+        """Imaginea figurii, din cache sau desenată acum cu `draw()` (care returnează figura)."""
+        key = self.key(name, data_hash, fmt, dpi, **params)
+        image = self.get(key, fmt)
+        if image is None:
+            fig = draw()
+            try:
+                image = self.put(key, fig, fmt, dpi)
+            finally:
+                _close(fig)
+        return image
+
+
+def _close(fig):
+    if fig.canvas.manager is not None:
+        import matplotlib.pyplot as plt  # figurile create prin pyplot trebuie eliberate din registrul lui
+        plt.close(fig)
+
+
+class FigureBatch:
+    """Figurile unei pagini: afișate din cache imediat, iar cele lipsă desenate în paralel la flush()."""
+
+    def __init__(self, cache=None, max_workers=MAX_WORKERS):
+        self.cache = cache or figure_cache
+        self.max_workers = max_workers
+        self._pending = []
+
+    def add(self, container, name, data_hash, draw, uses_pyplot=False, fmt="png", **params):
+        """Afișează figura în `container` (ex. st.empty()); dacă nu e în cache, o desenează la flush()."""
+        key = self.cache.key(name, data_hash, fmt, **params)
+        image = self.cache.get(key, fmt)
+        if image is not None:
+            container.image(image, use_container_width=True)
+        else:
+            self._pending.append((container, name, data_hash, draw, uses_pyplot, fmt, params))
+
+    def flush(self):
+        """Desenează figurile lipsă (în paralel, cu excepția celor pyplot) și le afișează."""
+        render = lambda job: self.cache.render(job[1], job[2], job[3], fmt=job[5], **job[6])
+        parallel = [job for job in self._pending if not job[4]]
+        sequential = [job for job in self._pending if job[4]]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [(job, executor.submit(render, job)) for job in parallel]
+            results = [(job, render(job)) for job in sequential]
+            results += [(job, future.result()) for job, future in futures]
+        for job, image in results:
+            job[0].image(image, use_container_width=True)
+        self._pending = []
+
+
+figure_cache = FigureCache()
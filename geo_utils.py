@@ -0,0 +1,218 @@
+"""
+Precalcularea tabelelor geografice folosite de pagina GeoPandas.
+
+Centroidul fiecărei țări și lista de vecini (țări care au graniță comună) nu depind de
+datele Spotify, deci se calculează o singură dată în pipeline și se salvează în data/.
+Vecinii se găsesc cu un spatial join (index STRtree), nu comparând fiecare țară cu toate celelalte.
+
+Tot aici sunt operațiile vectorizate pe coordonatele pieselor: distanțele dintre țările
+artiștilor de pe aceeași piesă, construirea punctelor (cu jitter) pentru hărți și agregarea
+pieselor per țară sau per celulă de grid, pentru hărți al căror cost nu crește cu numărul de piese.
+"""
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+
+COUNTRIES_SHP = "data/geopandas_data/ne_110m_admin_0_countries.shp"
+CENTROIDS_CSV = "data/country_centroids.csv"
+ADJACENCY_CSV = "data/country_adjacency.csv"
+TRACK_DISTANCES_CSV = "data/track_distances.csv"
+
+# Denumirile din country_list care diferă de coloana ADMIN a shapefile-ului
+COUNTRY_NAME_MAPPING = {
+    "United States": "United States of America",
+    "Columbia": "Colombia",
+}
+
+EARTH_RADIUS_KM = 6371.0088  # raza medie a Pământului
+
+
+def read_countries(path=COUNTRIES_SHP):
+    countries = gpd.read_file(path)
+    if countries.crs is None:
+        countries = countries.set_crs("EPSG:4326")
+    return countries
+
+
+def country_centroids(countries):
+    """Un rând per țară: ADMIN, lat, lon (centroidul geometriei)."""
+    centroids = countries.geometry.centroid
+    return pd.DataFrame({
+        'ADMIN': countries['ADMIN'].to_numpy(),
+        'lat': centroids.y.to_numpy(),
+        'lon': centroids.x.to_numpy(),
+    })
+
+
+def country_adjacency(countries, centroids=None):
+    """
+    Lista de muchii a grafului de vecinătate: câte un rând per pereche (country, neighbor),
+    împreună cu coordonatele centroizilor celor două țări.
+    """
+    if centroids is None:
+        centroids = country_centroids(countries)
+    left = countries[['ADMIN', 'geometry']]
+    right = countries[['ADMIN', 'geometry']].rename(columns={'ADMIN': 'neighbor'})
+    pairs = gpd.sjoin(left, right, how='inner', predicate='touches')
+    edges = pd.DataFrame({'country': pairs['ADMIN'].to_numpy(), 'neighbor': pairs['neighbor'].to_numpy()})
+    edges = edges[edges['country'] != edges['neighbor']]
+
+    coords = centroids.set_index('ADMIN')[['lat', 'lon']]
+    edges = edges.join(coords, on='country').join(coords, on='neighbor', rsuffix='_neighbor')
+    return edges.reset_index(drop=True)
+
+
+# --- Distanțe între țările artiștilor de pe aceeași piesă ---
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Distanța pe cerc mare (km) între perechi de puncte, calculată vectorizat pe array-uri NumPy."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=float)) for a in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def track_coordinates(country_list, centroids, country_mapping=COUNTRY_NAME_MAPPING):
+    """
+    Lista de coordonate (lat, lon) a țărilor fiecărei piese, din centroizii țărilor.
+    Țările fără centroid (denumire necunoscută) primesc None, ca poziția în listă să se păstreze.
+    """
+    coords = dict(zip(centroids['ADMIN'], zip(centroids['lat'], centroids['lon'])))
+    return country_list.str.split(', ').map(
+        lambda countries: [coords.get(country_mapping.get(c, c)) for c in countries]
+        if isinstance(countries, list) else []
+    )
+
+
+def track_points(coordinates):
+    """
+    Transformă o coloană de liste de coordonate (lat, lon) într-un tabel lung:
+    track_id, pos (poziția în listă), lat, lon. Coordonatele lipsă (None) sunt eliminate.
+    """
+    coords = coordinates.explode()
+    pos = coords.groupby(level=0).cumcount().to_numpy()
+    valid = coords.notna().to_numpy()
+    latlon = np.array(coords[valid].tolist(), dtype=float).reshape(-1, 2)
+    return pd.DataFrame({
+        'track_id': coords.index[valid],
+        'pos': pos[valid],
+        'lat': latlon[:, 0],
+        'lon': latlon[:, 1],
+    })
+
+
+def collaboration_distances(coordinates, exact=False):
+    """
+    Distanța pentru fiecare pereche de țări de pe aceeași piesă, calculată într-un singur pas.
+    Coloane: track_id, Coord1, Coord2 (pozițiile în listă), Distance (km).
+    Cu exact=True se folosește distanța geodezică (geopy), mai precisă dar mult mai lentă.
+    """
+    points = track_points(coordinates)
+    pairs = points.merge(points, on='track_id', suffixes=('_1', '_2'))
+    pairs = pairs[pairs['pos_1'] < pairs['pos_2']]
+
+    if exact:
+        from geopy.distance import geodesic
+        distances = [
+            geodesic((lat1, lon1), (lat2, lon2)).kilometers
+            for lat1, lon1, lat2, lon2 in pairs[['lat_1', 'lon_1', 'lat_2', 'lon_2']].itertuples(index=False)
+        ]
+    else:
+        distances = haversine_km(pairs['lat_1'], pairs['lon_1'], pairs['lat_2'], pairs['lon_2'])
+
+    return pd.DataFrame({
+        'track_id': pairs['track_id'].to_numpy(),
+        'Coord1': pairs['pos_1'].to_numpy(),
+        'Coord2': pairs['pos_2'].to_numpy(),
+        'Distance (km)': np.asarray(distances, dtype=float),
+    })
+
+
+def distance_summary(distances, index):
+    """
+    Distanța maximă și medie de colaborare per piesă, aliniate pe `index`.
+    Piesele fără perechi (un singur artist/țară) primesc 0.
+    """
+    summary = distances.groupby('track_id')['Distance (km)'].agg(['max', 'mean'])
+    summary.columns = ['max_collab_distance_km', 'mean_collab_distance_km']
+    return summary.reindex(index, fill_value=0.0)
+
+
+# --- Puncte pentru hărți ---
+
+def points_gdf(df, coordinates_col='coordinates', crs="EPSG:4326", jitter=0.0, seed=42):
+    """
+    GeoDataFrame cu câte un punct per (piesă, țară), construit în bloc cu points_from_xy.
+    Coloanele din df sunt păstrate. Cu jitter > 0, fiecare punct e deplasat aleator cu cel mult
+    `jitter` grade pe fiecare axă (reproductibil prin `seed`), ca punctele dintr-o țară să nu se suprapună.
+    """
+    points = track_points(df[coordinates_col])
+    lat = points['lat'].to_numpy()
+    lon = points['lon'].to_numpy()
+    if jitter:
+        rng = np.random.default_rng(seed)
+        lat = lat + rng.uniform(-jitter, jitter, size=len(lat))
+        lon = lon + rng.uniform(-jitter, jitter, size=len(lon))
+
+    rows = df.loc[points['track_id']].reset_index(drop=True)
+    return gpd.GeoDataFrame(rows, geometry=gpd.points_from_xy(lon, lat), crs=crs)
+
+
+# --- Straturi agregate ---
+
+def country_aggregates(df, countries, country_col='country_list', weight_col='streams', country_mapping=None):
+    """
+    Numărul de piese și suma stream-urilor per țară, atașate geometriei țărilor (pentru choropleth).
+    O piesă cu artiști din mai multe țări este numărată la fiecare dintre ele.
+    """
+    exploded = df[[country_col, weight_col]].copy()
+    exploded['ADMIN'] = exploded[country_col].str.split(', ')
+    exploded = exploded.explode('ADMIN')
+    if country_mapping:
+        exploded['ADMIN'] = exploded['ADMIN'].replace(country_mapping)
+
+    stats = exploded.groupby('ADMIN').agg(n_tracks=(weight_col, 'size'), streams_sum=(weight_col, 'sum'))
+    result = countries[['ADMIN', 'geometry']].merge(stats, left_on='ADMIN', right_index=True, how='left')
+    result[['n_tracks', 'streams_sum']] = result[['n_tracks', 'streams_sum']].fillna(0)
+    return result
+
+
+def grid_aggregates(points, cell_deg=5.0, weight_col='streams'):
+    """
+    Agregă punctele pe un grid regulat de `cell_deg` grade: numărul de puncte și suma ponderilor
+    per celulă, cu centrul celulei ca geometrie.
+    """
+    cells = pd.DataFrame({
+        'cell_x': np.floor(points.geometry.x.to_numpy() / cell_deg).astype(int),
+        'cell_y': np.floor(points.geometry.y.to_numpy() / cell_deg).astype(int),
+        'weight': points[weight_col].to_numpy(),
+    })
+    stats = cells.groupby(['cell_x', 'cell_y'])['weight'].agg(n_tracks='size', streams_sum='sum').reset_index()
+    centers_x = (stats['cell_x'] + 0.5) * cell_deg
+    centers_y = (stats['cell_y'] + 0.5) * cell_deg
+    return gpd.GeoDataFrame(stats, geometry=gpd.points_from_xy(centers_x, centers_y), crs=points.crs)
+
+
+def folium_choropleth(aggregates, value_col='streams_sum', legend_name='Stream-uri'):
+    """Hartă folium interactivă (choropleth) pe baza rezultatului din country_aggregates."""
+    import folium
+
+    m = folium.Map(location=[20, 0], zoom_start=2, tiles="cartodbpositron")
+    data = aggregates[['ADMIN', 'n_tracks', value_col, 'geometry']]
+    # Geometriile fără CRS sunt considerate deja în WGS84 (ca în read_countries)
+    data = data.set_crs("EPSG:4326") if data.crs is None else data.to_crs("EPSG:4326")
+    folium.Choropleth(
+        geo_data=data.to_json(),
+        data=data,
+        columns=['ADMIN', value_col],
+        key_on='feature.properties.ADMIN',
+        fill_color='YlGn',
+        nan_fill_color='lightgrey',
+        legend_name=legend_name,
+    ).add_to(m)
+    folium.GeoJson(
+        data.to_json(),
+        style_function=lambda feature: {'fillOpacity': 0, 'weight': 0},
+        tooltip=folium.GeoJsonTooltip(fields=['ADMIN', 'n_tracks', value_col],
+                                      aliases=['Țară', 'Piese', legend_name]),
+    ).add_to(m)
+    return m
@@ -2,6 +2,9 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from sklearn.preprocessing import LabelEncoder
+from data_loader import dataset_version, load_csv
+from outliers import detect_outliers
+from profiling import get_profile
 
 st.set_page_config(page_title="Top Spotify Songs 2023", layout="wide")
 
@@ -21,7 +24,8 @@ st.markdown(
 st.markdown('<h1 class="custom-title">Top Spotify Songs 2023</h1>', unsafe_allow_html=True)
 
 # Încarcă datele
-df = pd.read_csv("data/spotify-2023-updated.csv", encoding="ISO-8859-1")
+csv_path = "data/spotify-2023-updated.csv"
+df = load_csv(csv_path, encoding="ISO-8859-1")
 
 # --- SECTIUNEA 1: Vizualizari GENERALE (tip portret, cu coloane) ---
 st.subheader("Vizualizări generale")
@@ -106,15 +110,6 @@ Outlierii sunt valori care se abat puternic de la restul datelor. Pot fi erori d
 Mai jos folosim metoda IQR pentru a identifica valorile extreme.
 """)
 
-def find_outliers_iqr(df, col):
-    Q1 = df[col].quantile(0.25)  # Calculăm Q1
-    Q3 = df[col].quantile(0.75)  # Calculăm Q3
-    IQR = Q3 - Q1  # Intervalul intercuartilic
-    lower_bound = max(Q1 - 1.5 * IQR, 0) # Limita inferioară
-    upper_bound = max(Q3 + 1.5 * IQR, 0) # Limita superioară
-    outliers_df = df[(df[col] < lower_bound) | (df[col] > upper_bound)]  # Selectăm outlierii
-    return lower_bound, upper_bound, outliers_df
-
 # Coloane relevante pe care le-ai menționat
 relevant_cols = [
     'track_name', 'artist(s)_name', 'artist_count', 'released_year', 'released_month', 'released_day',
@@ -130,16 +125,22 @@ numeric_cols = df_clean.select_dtypes(include='number').columns.tolist()
 # Comparăm lista de coloane numerice cu cele relevante și le păstrăm doar pe cele care sunt numerice
 relevant_numeric_cols = [col for col in relevant_cols if col in numeric_cols]
 
+# Cuartilele tuturor coloanelor numerice, calculate o singură dată (partajate cu pagina NA_and_Outliers);
+# limitele IQR sunt limitate inferior la 0, deoarece coloanele sunt numărări
+profile_clean = get_profile(df_clean, (dataset_version(csv_path), 'main_clean'))
+outliers = detect_outliers(df_clean, relevant_numeric_cols, profile=profile_clean, min_bound=0)
+outlier_counts = outliers.masks['iqr'].sum()
+
 # Calculăm outlieri pentru fiecare coloană relevantă
 for col in relevant_numeric_cols:
     if col in df_clean.columns:
         st.markdown(f"###  Coloana: `{col}`")
 
         # Detectare outlieri
-        lower, upper, outliers = find_outliers_iqr(df_clean, col)
+        lower, upper = outliers.bounds.loc[col, ['lower', 'upper']]
         st.write(f"🔹 Limita inferioară: `{lower:,.0f}`")
         st.write(f"🔹 Limita superioară: `{upper:,.0f}`")
-        st.write(f"🔹 Număr de outlieri: `{len(outliers)}` din `{len(df_clean)}`")
+        st.write(f"🔹 Număr de outlieri: `{outlier_counts[col]}` din `{len(df_clean)}`")
 
         # Boxplot interactiv cu Plotly
         fig_box = px.box(df_clean, y=col, title="Boxplot pentru {col} (cu outlieri)")
@@ -0,0 +1,162 @@
+"""
+Registrul de modele antrenate.
+
+Fiecare model este salvat (joblib) împreună cu tot ce trebuie pentru a-l folosi pe date noi:
+scaler-ul, lista de caracteristici și, pentru clasificare, numele claselor (în ordinea codurilor).
+Versiunea unui model este dată de hash-ul datelor de antrenare și de parametrii antrenării,
+deci paginile pot încărca modelul existent în loc să-l reantreneze la fiecare afișare.
+
+Scorare offline a unui fișier cu piese noi:
+    python model_registry.py logistic_success data/data_with_encoding.csv predictii.csv
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+import joblib
+import numpy as np
+import pandas as pd
+
+REGISTRY_DIR = "data/models/registry"
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+@dataclass
+class ModelArtifact:
+    name: str
+    version: str
+    estimator: object
+    scaler: object
+    feature_cols: list
+    classes: list = None  # numele claselor, indexate după codul prezis
+    add_constant: bool = False  # modelele statsmodels OLS au nevoie de coloana de intercept
+    params: dict = field(default_factory=dict)
+    metrics: dict = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+
+    def _design_matrix(self, batch):
+        # np.array face o copie: scaler-urile din features.py scalează pe loc (copy=False)
+        X = self.scaler.transform(np.array(batch[self.feature_cols], dtype=np.float64))
+        if self.add_constant:
+            X = np.column_stack([np.ones(len(X)), X])
+        return X
+
+    def predict(self, batch):
+        """Predicții pentru un DataFrame cu piese noi (etichetele originale, pentru clasificare)."""
+        predictions = np.asarray(self.estimator.predict(self._design_matrix(batch)))
+        if self.classes is not None:
+            return np.asarray(self.classes)[predictions.astype(int)]
+        return predictions
+
+    def predict_proba(self, batch):
+        """Probabilitățile fiecărei clase (doar pentru clasificatori), cu numele claselor drept coloane."""
+        probabilities = self.estimator.predict_proba(self._design_matrix(batch))
+        columns = self.estimator.classes_
+        if self.classes is not None:
+            columns = np.asarray(self.classes)[columns.astype(int)]
+        return pd.DataFrame(probabilities, columns=columns, index=batch.index)
+
+
+def model_version(data_hash, params=None):
+    params_hash = hashlib.sha256(json.dumps(params or {}, sort_keys=True, default=str).encode("utf-8"))
+    return f"{data_hash}-{params_hash.hexdigest()[:8]}"
+
+
+def _model_path(name, version, registry_dir=REGISTRY_DIR):
+    return os.path.join(registry_dir, name, f"{version}.joblib")
+
+
+def _index_path(name, registry_dir=REGISTRY_DIR):
+    return os.path.join(registry_dir, name, "index.json")
+
+
+def save_model(artifact, registry_dir=REGISTRY_DIR):
+    """Salvează modelul și îl marchează ca ultima versiune a lui `artifact.name`."""
+    path = _model_path(artifact.name, artifact.version, registry_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump(artifact, path)
+
+    index_path = _index_path(artifact.name, registry_dir)
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+    index.setdefault("versions", {})[artifact.version] = {
+        "created_at": artifact.created_at,
+        "params": artifact.params,
+        "metrics": artifact.metrics,
+    }
+    index["latest"] = artifact.version
+    with open(index_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, default=str)
+
+    with _lock:
+        _loaded[(artifact.name, artifact.version)] = artifact
+    return path
+
+
+def load_model(name, version=None, registry_dir=REGISTRY_DIR):
+    """Încarcă o versiune anume (sau ultima salvată); returnează None dacă nu există."""
+    if version is None:
+        index_path = _index_path(name, registry_dir)
+        if not os.path.exists(index_path):
+            return None
+        with open(index_path, encoding="utf-8") as f:
+            version = json.load(f).get("latest")
+        if version is None:
+            return None
+
+    key = (name, version)
+    with _lock:
+        if key in _loaded:
+            return _loaded[key]
+    path = _model_path(name, version, registry_dir)
+    if not os.path.exists(path):
+        return None
+    artifact = joblib.load(path)
+    with _lock:
+        _loaded[key] = artifact
+    return artifact
+
+
+def get_or_train(name, data_hash, params, train, registry_dir=REGISTRY_DIR):
+    """
+    Returnează modelul pentru (date, parametri) din registru; dacă nu există, apelează `train()`
+    (care trebuie să returneze un ModelArtifact fără versiune completată), îl salvează și îl returnează.
+    """
+    version = model_version(data_hash, params)
+    artifact = load_model(name, version, registry_dir)
+    if artifact is None:
+        artifact = train()
+        artifact.name, artifact.version, artifact.params = name, version, params
+        save_model(artifact, registry_dir)
+    return artifact
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scorare offline cu un model din registru")
+    parser.add_argument("name", help="numele modelului (ex. logistic_success)")
+    parser.add_argument("input", help="CSV cu piesele de scorat")
+    parser.add_argument("output", help="CSV-ul rezultat (cu coloana 'prediction')")
+    parser.add_argument("--version", help="versiunea modelului (implicit ultima)")
+    args = parser.parse_args()
+
+    artifact = load_model(args.name, args.version)
+    if artifact is None:
+        raise SystemExit(f"Modelul '{args.name}' nu există în {REGISTRY_DIR}")
+
+    df = pd.read_csv(args.input)
+    df.columns = df.columns.str.strip()
+    df['prediction'] = artifact.predict(df)
+    df.to_csv(args.output, index=False)
+    print(f"{len(df)} piese scorate cu {artifact.name} ({artifact.version})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Detectarea outlierilor pe toate coloanele odată.
+
+Fiecare metodă returnează o matrice booleană (rânduri × coloane, True = outlier), calculată
+vectorizat pe matricea NumPy a coloanelor, fără copii ale DataFrame-ului per coloană:
+  - iqr: în afara intervalului [Q1 - 1.5·IQR, Q3 + 1.5·IQR] (cuartilele pot veni din profiling.get_profile);
+  - mad: scorul z robust |0.6745·(x - mediana) / MAD| peste prag (3.5, Iglewicz & Hoaglin);
+  - isolation_forest: scorul multivariat al unui IsolationForest (un rând e outlier pe toate coloanele),
+    antrenat în paralel cu joblib (n_jobs / backend).
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from joblib import parallel_backend
+
+IQR_FACTOR = 1.5
+MAD_THRESHOLD = 3.5
+METHODS = ('iqr', 'mad', 'isolation_forest')
+
+
+@dataclass
+class OutlierResult:
+    masks: dict  # metodă -> DataFrame boolean (aceleași rânduri și coloane ca datele)
+    bounds: pd.DataFrame  # limitele IQR per coloană ('lower', 'upper')
+
+    def counts(self):
+        """Numărul de outlieri per coloană (rânduri) și metodă (coloane)."""
+        return pd.DataFrame({method: mask.sum() for method, mask in self.masks.items()})
+
+    def any(self):
+        """True pentru rândurile marcate ca outlier de cel puțin o metodă, pe cel puțin o coloană."""
+        return pd.concat(self.masks.values(), axis=1).any(axis=1)
+
+
+def iqr_bounds(X, factor=IQR_FACTOR, quartiles=None, min_bound=None):
+    """Limitele IQR pentru fiecare coloană a lui X; `quartiles` = (Q1, Q3) deja calculate, opțional."""
+    if quartiles is None:
+        quartiles = np.nanquantile(X, [0.25, 0.75], axis=0)
+    q1, q3 = (np.asarray(q, dtype=np.float64) for q in quartiles)
+    iqr = q3 - q1
+    lower, upper = q1 - factor * iqr, q3 + factor * iqr
+    if min_bound is not None:
+        lower, upper = np.maximum(lower, min_bound), np.maximum(upper, min_bound)
+    return lower, upper
+
+
+def iqr_mask(X, lower, upper):
+    return (X < lower) | (X > upper)  # comparațiile cu NaN sunt False, deci valorile lipsă nu sunt outlieri
+
+
+def mad_mask(X, threshold=MAD_THRESHOLD):
+    median = np.nanmedian(X, axis=0)
+    mad = np.nanmedian(np.abs(X - median), axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        robust_z = 0.6745 * (X - median) / mad
+    # Coloanele cu MAD = 0 (ex. majoritatea valorilor egale): orice valoare diferită de mediană e outlier
+    robust_z = np.where(mad == 0, np.where((X != median) & ~np.isnan(X), np.inf, 0.0), robust_z)
+    return np.abs(robust_z) > threshold
+
+
+def isolation_forest_mask(X, contamination='auto', n_jobs=None, backend=None, random_state=42):
+    """Rândurile considerate anomalii de IsolationForest (valorile lipsă sunt înlocuite cu mediana)."""
+    from sklearn.ensemble import IsolationForest  # folosit doar pentru această metodă
+
+    X = np.where(np.isnan(X), np.nanmedian(X, axis=0), X)
+    model = IsolationForest(contamination=contamination, n_jobs=n_jobs, random_state=random_state)
+    if backend is None:
+        rows = model.fit_predict(X) == -1
+    else:
+        with parallel_backend(backend, n_jobs=n_jobs):
+            rows = model.fit_predict(X) == -1
+    return np.repeat(rows[:, None], X.shape[1], axis=1)
+
+
+def detect_outliers(df, columns=None, methods=('iqr',), profile=None, min_bound=None,
+                    factor=IQR_FACTOR, mad_threshold=MAD_THRESHOLD, n_jobs=None, backend=None):
+    """
+    Outlierii coloanelor `columns` (implicit toate cele numerice) după fiecare metodă din `methods`.
+    `profile` (profiling.get_profile) evită recalcularea cuartilelor; `min_bound` limitează inferior
+    ambele limite IQR (ex. 0 pentru numărări, care nu pot fi negative).
+    """
+    unknown = [method for method in methods if method not in METHODS]
+    if unknown:
+        raise ValueError(f"Metode necunoscute: {unknown}")
+    if columns is None:
+        columns = df.select_dtypes(include=[np.number]).columns
+    columns = list(columns)
+    X = df[columns].to_numpy(dtype=np.float64)
+
+    quartiles = None
+    if profile is not None:
+        quartiles = (profile.loc[columns, 'q25'].to_numpy(), profile.loc[columns, 'q75'].to_numpy())
+    lower, upper = iqr_bounds(X, factor, quartiles, min_bound)
+
+    masks = {}
+    for method in methods:
+        if method == 'iqr':
+            mask = iqr_mask(X, lower, upper)
+        elif method == 'mad':
+            mask = mad_mask(X, mad_threshold)
+        else:
+            mask = isolation_forest_mask(X, n_jobs=n_jobs, backend=backend)
+        masks[method] = pd.DataFrame(mask, index=df.index, columns=columns)
+    return OutlierResult(masks, pd.DataFrame({'lower': lower, 'upper': upper}, index=columns))
@@ -4,43 +4,51 @@ import pandas as pd
 import streamlit as st
 import plotly.express as px
 from sklearn.preprocessing import LabelEncoder
-import matplotlib.pyplot as plt
 import seaborn as sns
 import unicodedata
+from functools import partial
+from data_loader import load_dataset
+from features import dataset_hash
+from figure_cache import FigureBatch, new_figure
 
 
 st.set_page_config(page_title="Enconding", layout="wide")
 st.title("Encodarea variabilelor")
 
 
-df = pd.read_csv("data/data_with_country_list.csv", encoding="ISO-8859-1")
-df.columns = df.columns.str.strip()
+df = load_dataset("data/data_with_country_list.csv")
+
+# Figurile sunt servite din cache; cele lipsă se desenează în paralel la finalul paginii
+figures = FigureBatch()
 
 # 5. Analiza distribuției datelor pentru variabilele categorice
 st.subheader("Analiza distribuției datelor pentru variabilele categorice")
 
-categorical_cols = [col for col in df.select_dtypes(include=['object']).columns if col != 'track_name']
+categorical_cols = [col for col in df.select_dtypes(include=['object', 'category']).columns if col != 'track_name']
 
-for col in categorical_cols:
-    plt.figure(figsize=(8, 4))
+def draw_category_counts(df, col):
+    fig = new_figure((8, 4))
+    ax = fig.subplots()
     unique_count = df[col].nunique()
 
     if unique_count > 10:
         top_categories = df[col].value_counts().nlargest(10)
-        sns.barplot(x=top_categories.index, y=top_categories.values, palette='viridis')
-        plt.title(f"Top 10 valori pentru {col}")
-        plt.xlabel(col)
-        plt.ylabel("Frecvență")
-        plt.xticks(rotation=45)
+        sns.barplot(x=top_categories.index, y=top_categories.values, palette='viridis', ax=ax)
+        ax.set_title(f"Top 10 valori pentru {col}")
     else:
-        sns.countplot(x=col, data=df, palette='viridis')
-        plt.title(f'Distribuția: {col}')
-        plt.xlabel(col)
-        plt.ylabel('Frecvență')
-        plt.xticks(rotation=45)
+        sns.countplot(x=col, data=df, palette='viridis', ax=ax)
+        ax.set_title(f'Distribuția: {col}')
+    ax.set_xlabel(col)
+    ax.set_ylabel('Frecvență')
+    ax.tick_params(axis='x', labelrotation=45)
+
+    fig.tight_layout()
+    return fig
 
-    plt.tight_layout()
-    st.pyplot(plt)
+
+for col in categorical_cols:
+    figures.add(st.empty(), "encoding_counts", dataset_hash(df, [col]), partial(draw_category_counts, df[[col]], col),
+                column=col)
 
 for col in categorical_cols:
     st.write(f"Numărul de instanțe pentru fiecare categorie din `{col}`:")
@@ -78,13 +86,20 @@ st.write("Frecvența encodată pentru fiecare gen:")
 st.dataframe(unique_genres, use_container_width=True)
 
 # --- Vizualizare distribuiție pentru variabila genre_freq_encoded ---
+def draw_frequency_histogram(values, title):
+    fig = new_figure((8, 4))
+    ax = fig.subplots()
+    sns.histplot(values, bins=20, kde=True, color='purple', ax=ax)
+    ax.set_title(title)
+    ax.set_xlabel('Frecvența Encodată')
+    ax.set_ylabel('Număr de Instanțe')
+    return fig
+
+
 st.subheader("Distribuția Frequency Encoding pentru Genre")
-plt.figure(figsize=(8, 4))
-sns.histplot(df['genre_freq_encoded'], bins=20, kde=True, color='purple')
-plt.title('Distribuția Frequency Encoding pentru Genre')
-plt.xlabel('Frecvența Encodată')
-plt.ylabel('Număr de Instanțe')
-st.pyplot(plt)
+figures.add(st.empty(), "encoding_frequency", dataset_hash(df, ['genre_freq_encoded']),
+            partial(draw_frequency_histogram, df['genre_freq_encoded'], 'Distribuția Frequency Encoding pentru Genre'),
+            column='genre_freq_encoded')
 
 # Calculăm frecvența pentru fiecare combinație de țări
 country_freq = df['country_list'].value_counts(normalize=True)
@@ -101,13 +116,12 @@ st.dataframe(unique_countries, use_container_width=True)
 
 # --- Vizualizare distribuiție pentru variabila country_list_encoded ---
 st.subheader("Distribuția Frequency Encoding pentru Country")
-plt.figure(figsize=(8, 4))
-sns.histplot(df['country_list_encoded'], bins=20, kde=True, color='purple')
-plt.title('Distribuția Frequency Encoding pentru Country')
-plt.xlabel('Frecvența Encodată')
-plt.ylabel('Număr de Instanțe')
-st.pyplot(plt)
+figures.add(st.empty(), "encoding_frequency", dataset_hash(df, ['country_list_encoded']),
+            partial(draw_frequency_histogram, df['country_list_encoded'], 'Distribuția Frequency Encoding pentru Country'),
+            column='country_list_encoded')
 
-#ama daugat fisierele noi in github
+# Figurile care nu erau în cache sunt desenate acum, în paralel, în locurile rezervate mai sus
+figures.flush()
 
-df.to_csv("data/data_with_encoding.csv", index=False)
+#ama daugat fisierele noi in github
+# data/data_with_encoding.csv este generat de pipeline.py (etapa 'encoding')
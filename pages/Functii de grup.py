@@ -1,15 +1,59 @@
+import os
+
 import streamlit as st
 import pandas as pd
+from aggregation import AGG_FUNCS, AggregationCube
+from data_loader import load_dataset, read_sample
+from sketches import (APPROX_FUNCS, TooManyGroupsError, hll_relative_error, kll_rank_error, load_or_build_sketches,
+                      sketchable_columns)
 
 st.set_page_config(page_title="Prelucrări Statistice", layout="wide")
 st.title("Prelucrări statistice și funcții de grup")
 
-# Încarcă datele deja scalate
-df = pd.read_csv("data/data_with_encoding.csv")
+csv_path = "data/data_with_encoding.csv"
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def get_cube(path, mtime):
+    # Un singur cub per versiune a fișierului; parțialele și rezultatele rămân în el între rerulări
+    df = load_dataset(path)
+    categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+    numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns.tolist()
+    return AggregationCube(df, categorical_cols, numeric_cols)
+
+
+@st.cache_resource(show_spinner="Se construiesc sketch-urile...", max_entries=4)
+def get_sketches(path, mtime, column, numeric_cols):
+    # Doar variabila selectată: sketch-urile celorlalte se construiesc (și se salvează) când sunt cerute
+    return load_or_build_sketches(path, column, list(numeric_cols))
+
+
+# Modul aproximativ nu încarcă setul de date în memorie: îl parcurge o singură dată, pe bucăți
+approximate = st.radio(
+    "Mod de calcul",
+    ["Exact", "Aproximativ (sketch-uri, pentru seturi foarte mari)"],
+    horizontal=True,
+).startswith("Aproximativ")
+
+if approximate:
+    # Coloanele și tipurile lor, dintr-un eșantion de la începutul fișierului
+    sample = read_sample(csv_path)
+    all_categorical = sample.select_dtypes(include=['object', 'category']).columns.tolist()
+    numeric_cols = sample.select_dtypes(include=['float64', 'int64']).columns.tolist()
+    available_funcs = APPROX_FUNCS
+    # Variabilele aproape unice (ex. track_name) ar avea câte un sketch per rând: rămân doar în modul exact
+    categorical_cols = sketchable_columns(sample, all_categorical)
+    skipped = [col for col in all_categorical if col not in categorical_cols]
+    if skipped:
+        st.caption(f"Disponibile doar în modul exact (prea multe grupuri): {', '.join(skipped)}")
+else:
+    # Încarcă datele deja scalate
+    cube = get_cube(csv_path, os.path.getmtime(csv_path))
 
-# Identificăm coloanele categorice și numerice
-categorical_cols = df.select_dtypes(include='object').columns.tolist()
-numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns.tolist()
+    # Identificăm coloanele categorice și numerice
+    categorical_cols = cube.categorical_cols
+    numeric_cols = cube.numeric_cols
+    available_funcs = AGG_FUNCS
 
 st.subheader("1. Grupare pe bază de o variabilă categorică")
 
@@ -25,14 +69,28 @@ selected_nums = st.multiselect(
 # Alegem funcțiile de agregare
 agg_funcs = st.multiselect(
     "Alege funcțiile de agregare:",
-    ['mean', 'std', 'min', 'max', 'median', 'count'],
+    available_funcs,
     default=['mean', 'std']
 )
 
 if selected_cat and selected_nums and agg_funcs:
-    grouped_df = df.groupby(selected_cat)[selected_nums].agg(agg_funcs)
+    if approximate:
+        try:
+            sketches = get_sketches(csv_path, os.path.getmtime(csv_path), selected_cat, tuple(numeric_cols))
+        except TooManyGroupsError as e:
+            st.error(f"{e}. Folosește modul exact pentru această variabilă.")
+            st.stop()
+        grouped_df = sketches.aggregate(selected_nums, agg_funcs)
+    else:
+        grouped_df = cube.aggregate(selected_cat, selected_nums, agg_funcs)
     st.subheader("2. Rezultatele agregării")
     st.dataframe(grouped_df, use_container_width=True)
+    if approximate:
+        st.caption(
+            f"count, mean, std, min și max sunt exacte. median: eroare de rang de cel mult "
+            f"±{kll_rank_error():.1%} din numărul de valori al grupului (KLL). "
+            f"nunique: eroare relativă standard ±{hll_relative_error():.1%} (HyperLogLog)."
+        )
 
     csv = grouped_df.reset_index().to_csv(index=False).encode('utf-8')
     st.download_button("Descarcă tabelul agregat CSV", csv, file_name="grupare_statistica.csv")
@@ -1,104 +1,89 @@
+import os
 import pandas as pd
 import geopandas as gpd
 import streamlit as st
 import chardet
 import matplotlib.pyplot as plt
-from shapely.geometry import Point
-from geopy.distance import geodesic
 import numpy as np
-import folium
+from data_loader import load_dataset, load_geodata
+from artist_index import collab_flags
+from geo_utils import (ADJACENCY_CSV, CENTROIDS_CSV, COUNTRIES_SHP, COUNTRY_NAME_MAPPING, country_adjacency,
+                       country_aggregates, country_centroids, folium_choropleth, grid_aggregates, points_gdf,
+                       track_coordinates)
+import streamlit.components.v1 as components
+from matplotlib.collections import LineCollection
 
 st.set_page_config(page_title="Geopandas", layout="wide")
 st.title("Analiza geografica a distribuitiei melodiilor si artistilor")
 
-# Încarcă datele din fișierele CSV
-df = pd.read_csv("data/data_cleaned_spotify.csv", encoding="utf-8")
-artist_data = pd.read_csv("data/artists_data.csv", index_col=None)  # Fișierul cu informații despre artiști
-
-# Curăță coloanele pentru a elimina spațiile suplimentare
-df.columns = df.columns.str.strip()
-artist_data.columns = artist_data.columns.str.strip()
-
-# Înlocuim NaN cu 'Unknown' și convertim toate valorile în tipul 'str'
-artist_data['country'] = artist_data['country'].fillna('Unknown').astype(str)
-
-# Creăm un dictionar cu țările fiecărui artist
-artist_country_mapping = artist_data.set_index('artist_name')['country'].to_dict()
-
-def get_country_list(artist_names):
-    # Separați artiștii pe baza virgulei
-    artist_names_list = artist_names.split(', ')
-    # Căutăm țara fiecărui artist și le adăugăm într-o listă
-    country_list = {artist_country_mapping.get(artist, 'Unknown') for artist in artist_names_list}
-    # Returnăm lista de țări unică (fără duplicate)
-    return ', '.join(sorted(country_list))
-
-# Aplicăm funcția pentru a adăuga o nouă coloană 'country_list'
-df['country_list'] = df['artist(s)_name'].apply(get_country_list)
-
-# --- Salvăm fișierul cu noile informații ---
-df.to_csv("data/data_with_country_list.csv", index=False)
-
-print("Fișierul cu lista de țări a fost salvat.")
-
-# Încărcăm datele țărilor
-countries = gpd.read_file("data/geopandas_data/ne_110m_admin_0_countries.shp")
-
-# Creăm un dicționar pentru a stoca coordonatele (centroid) pentru fiecare țară
-country_coordinates = {}
-for _, row in countries.iterrows():
-    country_name = row['ADMIN']
-    # Extragem centrul țării ca punct (centroid)
-    country_centroid = row.geometry.centroid
-    # Salvăm coordonatele latitudine și longitudine
-    country_coordinates[country_name] = (country_centroid.y, country_centroid.x)
-
-# Adăugăm un mapping pentru corectarea denumirilor
-country_mapping = {
-    "United States": "United States of America",
-    "Columbia": "Colombia",
-    # Verifică dacă denumirea este corectă
-    # Adaugă alte mappinguri dacă este necesar
-}
-
-# Modifică funcția get_coordinates_for_countries pentru a utiliza acest mapping
-def get_coordinates_for_countries(country_list):
-    countries_list = country_list.split(', ')
-    coordinates = []
-    for country in countries_list:
-        # Folosim mappingul pentru denumirile țării
-        country = country_mapping.get(country, country)  # Dacă nu există în mapping, păstrează denumirea originală
-        if country in country_coordinates:
-            coordinates.append(country_coordinates[country])
-        else:
-            print(f"Coordonate lipsă pentru: {country}")  # Debugging
-            coordinates.append(None)
-    return coordinates
-
-# Aplicăm funcția pentru a adăuga coordonatele
-df['coordinates'] = df['country_list'].apply(get_coordinates_for_countries)
+# Încarcă datele cu lista de țări (generate de pipeline.py, etapa 'country_list')
+# (load_dataset curăță deja coloanele de spațiile suplimentare)
+df = load_dataset("data/data_with_country_list.csv")
+# Tabela piesă <-> artist (track_id = poziția piesei în df), folosită pentru detectarea colaborărilor
+track_artists = load_dataset("data/track_artists.csv")
+is_collab = collab_flags(track_artists)
 
-# --- 1. Vizualizare harta globală cu distribuția melodiilor ---
-# Creăm un GeoDataFrame pentru a adăuga punctele artiștilor pe hartă
-# Explodăm dataframe-ul ca să avem câte un rând per coordonată
-exploded_df = df.explode('coordinates').reset_index(drop=True)
+# Încărcăm datele țărilor (shapefile-ul nu are .prj, deci fără CRS presupunem WGS84)
+countries = load_geodata(COUNTRIES_SHP)
+if countries.crs is None:
+    countries.set_crs("EPSG:4326", allow_override=True, inplace=True)
 
-# Eliminăm rândurile cu coordonate lipsă
-exploded_df = exploded_df[exploded_df['coordinates'].notnull()].copy()
+@st.cache_data(show_spinner=False, max_entries=2)
+def get_country_tables(path, mtime):
+    # Centroizii și vecinii (spatial join), calculați o singură dată per versiune a shapefile-ului
+    countries = load_geodata(path)
+    centroids = country_centroids(countries)
+    return centroids, country_adjacency(countries, centroids)
 
-# Creăm o coloană geometry din coordonate
-exploded_df['geometry'] = exploded_df['coordinates'].apply(lambda coord: Point(coord[1], coord[0]))
 
-# Construim GeoDataFrame corect
-gdf_artists = gpd.GeoDataFrame(exploded_df, geometry='geometry', crs=countries.crs)
+# Centroizii și vecinii țărilor sunt precalculați de pipeline.py (etapele country_centroids/country_adjacency)
+try:
+    centroids = load_dataset(CENTROIDS_CSV)
+    adjacency = load_dataset(ADJACENCY_CSV)
+except FileNotFoundError:
+    # Tabelele nu au fost generate încă: le calculăm în memorie, fără să le salvăm (din cache la rerulare)
+    centroids, adjacency = get_country_tables(COUNTRIES_SHP, os.path.getmtime(COUNTRIES_SHP))
 
-# Plotăm harta cu distribuția melodiilor
-fig, ax = plt.subplots(figsize=(10, 10))
-countries.plot(ax=ax, color='lightgrey')
-gdf_artists.plot(ax=ax, color='red', markersize=5, alpha=0.5)
+# Coordonatele (centroizii) țărilor fiecărei piese; denumirile sunt corectate cu COUNTRY_NAME_MAPPING
+df['coordinates'] = track_coordinates(df['country_list'], centroids)
 
-plt.title("Distribuția melodiilor pe hartă")
-st.pyplot(fig)
+# --- 1. Vizualizare harta globală cu distribuția melodiilor ---
+# Creăm un GeoDataFrame cu câte un punct per coordonată (coordonatele lipsă sunt eliminate)
+gdf_artists = points_gdf(df, crs=countries.crs)
+
+# Modul de afișare: modurile agregate desenează câte un element per țară/celulă, nu per piesă
+map_mode = st.radio(
+    "Mod de afișare a hărții",
+    ["Agregat per țară", "Agregat pe grid", "Interactiv (folium)", "Puncte (fiecare piesă)"],
+    horizontal=True,
+)
+
+if map_mode == "Puncte (fiecare piesă)":
+    # Plotăm harta cu distribuția melodiilor
+    fig, ax = plt.subplots(figsize=(10, 10))
+    countries.plot(ax=ax, color='lightgrey')
+    gdf_artists.plot(ax=ax, color='red', markersize=5, alpha=0.5)
+    plt.title("Distribuția melodiilor pe hartă")
+    st.pyplot(fig)
+elif map_mode == "Agregat pe grid":
+    cell_deg = st.slider("Dimensiunea celulei (grade)", 1, 20, 5)
+    grid = grid_aggregates(gdf_artists, cell_deg=cell_deg)
+    fig, ax = plt.subplots(figsize=(10, 10))
+    countries.plot(ax=ax, color='lightgrey')
+    # Mărimea markerului ~ numărul de piese, culoarea ~ suma stream-urilor din celulă
+    grid.plot(ax=ax, column='streams_sum', cmap='Reds', markersize=grid['n_tracks'] * 5, alpha=0.7, legend=True)
+    plt.title("Distribuția melodiilor pe hartă (agregat pe grid)")
+    st.pyplot(fig)
+else:
+    country_stats = country_aggregates(df, countries, country_mapping=COUNTRY_NAME_MAPPING)
+    if map_mode == "Interactiv (folium)":
+        components.html(folium_choropleth(country_stats)._repr_html_(), height=600)
+    else:
+        fig, ax = plt.subplots(figsize=(10, 10))
+        country_stats.plot(ax=ax, column='streams_sum', cmap='Reds', edgecolor='white', legend=True,
+                           legend_kwds={'label': "Stream-uri (suma per țară)", 'shrink': 0.5})
+        plt.title("Distribuția melodiilor pe hartă (stream-uri per țară)")
+        st.pyplot(fig)
 
 # --- 2. Vizualizare harta cu granițele și vecinii țărilor ---
 # Creăm o hartă care include atât țărilor, cât și vecinii lor
@@ -107,89 +92,29 @@ fig, ax = plt.subplots(figsize=(12, 12))
 # Harta țărilor
 countries.plot(ax=ax, color='lightgrey', edgecolor='black')
 
-# Adăugăm vecinii pentru fiecare țară
-for _, row in countries.iterrows():
-    country_name = row['ADMIN']
-    neighbors = countries[countries.geometry.touches(row.geometry)]
-    for _, neighbor_row in neighbors.iterrows():
-        ax.plot([row.geometry.centroid.x, neighbor_row.geometry.centroid.x],
-                [row.geometry.centroid.y, neighbor_row.geometry.centroid.y], color="blue", alpha=0.3)
+# Adăugăm vecinii pentru fiecare țară: toate segmentele centroid-centroid desenate dintr-o dată
+segments = adjacency[['lon', 'lat', 'lon_neighbor', 'lat_neighbor']].to_numpy().reshape(-1, 2, 2)
+ax.add_collection(LineCollection(segments, colors="blue", alpha=0.3))
 
 gdf_artists.plot(ax=ax, color='red', markersize=5, alpha=0.5)
 plt.title("Distribuția melodiilor și vecinii țărilor")
 st.pyplot(fig)
 
-# --- 3. Calcularea distanțelor și traseelor între artiști ---
-def calculate_distances(coords):
-    if len(coords) > 1:
-        distances = []
-        for i in range(len(coords)):
-            for j in range(i + 1, len(coords)):
-                if coords[i] and coords[j]:
-                    dist = geodesic(coords[i], coords[j]).kilometers
-                    distances.append((i, j, dist))
-        return distances
-    return []
-
-# Calculăm distanțele între țările din fiecare melodie
-distances_list = []
-for _, row in df.iterrows():
-    distances = calculate_distances(row['coordinates'])
-    distances_list.extend(distances)
-
-# Creăm un DataFrame pentru distanțele calculate
-distances_df = pd.DataFrame(distances_list, columns=["Coord1", "Coord2", "Distance (km)"])
-
-# --- FILTRARE MELODII CU ARTIȘTI DIN SUA ---
-df_usa = df[df['country_list'].str.contains("United States of America")]
-
-
-
-df_usa['is_collab'] = df_usa['artist(s)_name'].apply(lambda x: ',' in x)
-
-# Explodăm coordonatele pentru fiecare melodie
-exploded_usa_df = df_usa.explode('coordinates').reset_index(drop=True)
-exploded_usa_df = exploded_usa_df[exploded_usa_df['coordinates'].notnull()].copy()
-exploded_usa_df['geometry'] = exploded_usa_df['coordinates'].apply(lambda coord: Point(coord[1], coord[0]))
-gdf_usa = gpd.GeoDataFrame(exploded_usa_df, geometry='geometry', crs=countries.crs)
-
-def add_jitter(point, jitter_degree=0.5):
-    lat, lon = point.y, point.x
-    jittered_lat = lat + np.random.uniform(-jitter_degree, jitter_degree)
-    jittered_lon = lon + np.random.uniform(-jitter_degree, jitter_degree)
-    return Point(jittered_lon, jittered_lat)
-
-# Aplicăm jitter doar pentru SUA (unde toate punctele sunt identice)
-gdf_usa['geometry'] = gdf_usa['geometry'].apply(lambda p: add_jitter(p, jitter_degree=0.7))
+# Distanța maximă/medie de colaborare per melodie este calculată de pipeline.py (etapa 'track_distances')
 
 # --- ÎNCARCAREA DATELOR CU LACURI ---
-lakes = gpd.read_file("data/geopandas_data/ne_110m_admin_0_countries_lakes.shp")  # Înlocuiește cu calea către shapefile-ul lacurilor
+lakes = load_geodata("data/geopandas_data/ne_110m_admin_0_countries_lakes.shp")  # Înlocuiește cu calea către shapefile-ul lacurilor
 if lakes.crs is None:
     lakes.set_crs("EPSG:4326", allow_override=True, inplace=True)
 
-if countries.crs is None:
-    countries.set_crs("EPSG:4326", allow_override=True, inplace=True)
-
 lakes = lakes.to_crs(countries.crs)
 
 # --- FILTRARE MELODII CU ARTIȘTI DIN SUA ---
-df_usa = df[df['country_list'].str.contains("United States of America")]
-df_usa['is_collab'] = df_usa['artist(s)_name'].apply(lambda x: ',' in x)
-
-# Explodăm coordonatele pentru fiecare melodie
-exploded_usa_df = df_usa.explode('coordinates').reset_index(drop=True)
-exploded_usa_df = exploded_usa_df[exploded_usa_df['coordinates'].notnull()].copy()
-exploded_usa_df['geometry'] = exploded_usa_df['coordinates'].apply(lambda coord: Point(coord[1], coord[0]))
-gdf_usa = gpd.GeoDataFrame(exploded_usa_df, geometry='geometry', crs=countries.crs)
-
-# Aplicăm jitter doar pentru SUA (pentru a evita suprapunerea punctelor)
-def add_jitter(point, jitter_degree=0.5):
-    lat, lon = point.y, point.x
-    jittered_lat = lat + np.random.uniform(-jitter_degree, jitter_degree)
-    jittered_lon = lon + np.random.uniform(-jitter_degree, jitter_degree)
-    return Point(jittered_lon, jittered_lat)
-
-gdf_usa['geometry'] = gdf_usa['geometry'].apply(lambda p: add_jitter(p, jitter_degree=0.7))
+df_usa = df[df['country_list'].str.contains("United States of America")].copy()
+df_usa['is_collab'] = df_usa.index.map(is_collab).fillna(False).astype(bool)
+
+# Câte un punct per coordonată, cu jitter (seed fix) pentru a evita suprapunerea punctelor
+gdf_usa = points_gdf(df_usa, crs=countries.crs, jitter=0.7, seed=42)
 
 # --- 2. Plotare hartă cu zoom pe SUA ---
 fig, ax = plt.subplots(figsize=(12, 10))
@@ -1,41 +1,52 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
-import os
-from pages.Vizualizari import convert_numeric_columns, afiseaza_info_df
+from functools import partial
+from pages.Vizualizari import afiseaza_info_df
+from data_loader import dataset_version, load_csv
+from figure_cache import FigureBatch, new_figure
+from outliers import detect_outliers
+from profiling import get_profile
 
 st.set_page_config(page_title="NA_Outliers", layout="wide")
 st.title("Tratarea valorilor lipsă și a outlierilor")
 
-df = pd.read_csv("data/spotify-2023-updated.csv", encoding="ISO-8859-1")
-df.columns = df.columns.str.strip()
-convert_numeric_columns(df)
+csv_path = "data/spotify-2023-updated.csv"
+df = load_csv(csv_path, encoding="ISO-8859-1", convert_numeric=True)
+data_version = dataset_version(csv_path)
 # afiseaza_info_df(df)
 
+# Figurile sunt servite din cache (cheie: versiunea fișierului sursă + numele și parametrii graficului);
+# toate datele desenate derivă determinist din acest fișier, deci nu le mai hash-uim la fiecare rerulare.
+# Cele lipsă se desenează în paralel la finalul paginii
+figures = FigureBatch()
+
 # Codul tău cu tratarea NA + outlieri
 st.subheader("Tratarea valorilor lipsă")
 
 df_clean=df.copy()
-missing_vals = df_clean.isnull().sum()
-missing_percent = (missing_vals / len(df_clean)) * 100
+# Valorile lipsă vin din profilul coloanelor (calculat o singură dată per versiune a datelor)
+profile = get_profile(df, (data_version, 'raw'))
 missing_df = pd.DataFrame({
-    'Missing Values': missing_vals,
-    'Percentage': missing_percent
+    'Missing Values': profile['nulls'],
+    'Percentage': profile['null_pct']
 })
 missing_df = missing_df[missing_df['Missing Values'] > 0].sort_values('Percentage', ascending=False)
 
-plt.figure(figsize=(7, 2))
-missing_df['Percentage'].plot(kind='barh', color='blue')
-plt.title('Procentul valorilor lipsă per coloană')
-plt.xlabel('Procent (%)')
-plt.grid(axis='x', linestyle='--', alpha=0.7)
-plt.tight_layout()
+def draw_missing(missing_df):
+    fig = new_figure((7, 2))
+    ax = fig.subplots()
+    missing_df['Percentage'].plot(kind='barh', color='blue', ax=ax)
+    ax.set_title('Procentul valorilor lipsă per coloană')
+    ax.set_xlabel('Procent (%)')
+    ax.grid(axis='x', linestyle='--', alpha=0.7)
+    fig.tight_layout()
+    return fig
 
 st.table(missing_df)
-st.pyplot(plt)
+figures.add(st.empty(), "na_missing", data_version, partial(draw_missing, missing_df))
 
 def fill_na_object(df, column_name):
     """
@@ -66,6 +77,8 @@ def fill_na_numeric(df, column_name):
 df_clean = fill_na_object(df_clean, 'key')
 df_clean = fill_na_numeric(df_clean, 'in_shazam_charts')
 
+# Profilul datelor completate: asimetria și cuartilele tuturor coloanelor numerice, într-o singură trecere
+profile_clean = get_profile(df_clean, (data_version, 'filled'))
 
 # Afișează numărul de valori lipsă după completare
 missing_after = df_clean[['key', 'in_shazam_charts']].isnull().sum().reset_index()
@@ -81,23 +94,25 @@ n_cols = 3
 n_rows = len(numerical_cols) // n_cols + (len(numerical_cols) % n_cols > 0)
 
 
+def draw_histograms(df, columns):
+    fig = new_figure((6 * n_cols, 4 * n_rows))
+    for i, col in enumerate(columns):
+        ax = fig.add_subplot(n_rows, n_cols, i + 1)
+        ax.hist(df[col].dropna(), bins=30, edgecolor='black', color='skyblue')
+        ax.set_title(f'Distribuția: {col}')
+        ax.set_xlabel(col)
+        ax.set_ylabel('Frecvență')
+    fig.subplots_adjust(hspace=0.5, wspace=0.3)  # hspace: distanța verticală, wspace: distanța orizontală
+    return fig
+
+
 # Funcția pentru a vizualiza histograma și a decide care coloane au outlieri
 def display_histograms_and_select_outliers(df):
-    outlier_columns = []
     st.subheader("Distribuția variabilelor numerice (Histograme)")
-    plt.figure(figsize=(6 * n_cols, 4 * n_rows))
-    for i, col in enumerate(numerical_cols):
-        plt.subplot(n_rows, n_cols, i + 1)
-        plt.hist(df[col].dropna(), bins=30, edgecolor='black', color='skyblue')
-        plt.title(f'Distribuția: {col}')
-        plt.xlabel(col)
-        plt.ylabel('Frecvență')
-        if df_clean[col].skew() > 1:  # Poți ajusta acest prag
-            outlier_columns.append(col)
-    plt.subplots_adjust(hspace=0.5, wspace=0.3)  # hspace: distanța verticală, wspace: distanța orizontală
-    st.pyplot(plt)
-    plt.close()
-    return outlier_columns
+    columns = list(numerical_cols)
+    figures.add(st.empty(), "na_histograms", data_version, partial(draw_histograms, df, columns),
+                columns=columns)
+    return [col for col in columns if profile_clean.at[col, 'skew'] > 1]  # Poți ajusta acest prag
 
 outlier_columns = display_histograms_and_select_outliers(df)
 
@@ -111,16 +126,20 @@ else:
 # 3. Density Plots pentru variabilele numerice
 st.subheader("Density Plots pentru variabile numerice")
 
-plt.figure(figsize=(6 * n_cols, 4 * n_rows))
-for i, col in enumerate(numerical_cols):
-    plt.subplot(n_rows, n_cols, i + 1)
-    sns.kdeplot(df_clean[col].dropna(), shade=True, color='orange')
-    plt.title(f'Distribuția (Density Plot): {col}')
-    plt.xlabel(col)
-    plt.ylabel('Frecvență')
-
-plt.tight_layout()
-st.pyplot(plt)
+def draw_density(df, columns):
+    fig = new_figure((6 * n_cols, 4 * n_rows))
+    for i, col in enumerate(columns):
+        ax = fig.add_subplot(n_rows, n_cols, i + 1)
+        sns.kdeplot(df[col].dropna(), shade=True, color='orange', ax=ax)
+        ax.set_title(f'Distribuția (Density Plot): {col}')
+        ax.set_xlabel(col)
+        ax.set_ylabel('Frecvență')
+    fig.tight_layout()
+    return fig
+
+density_cols = list(numerical_cols)
+figures.add(st.empty(), "na_density", data_version,
+            partial(draw_density, df_clean[density_cols], density_cols), columns=density_cols)
 
 st.write("Vom elimina coloana `instrumentalness` din analiza.")
 if 'instrumentalness_%' in df_clean.columns:
@@ -143,8 +162,10 @@ st.subheader("Pair Plots pentru variabile numerice")
 # Alege variabile numerice relevante pentru pair plot
 selected_numerical_cols = numerical_cols[:5]  # Selectează primele 5 coloane numerice pentru pair plot
 
-sns.pairplot(df[selected_numerical_cols].dropna())
-st.pyplot(plt)
+# sns.pairplot lucrează prin pyplot, deci e desenat secvențial (uses_pyplot)
+pair_data = df[selected_numerical_cols].dropna()
+figures.add(st.empty(), "na_pairplot", data_version,
+            lambda: sns.pairplot(pair_data).figure, uses_pyplot=True)
 
 
 # --- SECTIUNEA 4: Valori extreme (outlieri) ---
@@ -155,15 +176,6 @@ Outlierii sunt valori care se abat puternic de la restul datelor. Pot fi erori d
 Mai jos folosim metoda IQR pentru a identifica valorile extreme.
 """)
 
-def find_outliers_iqr(df, col):
-    Q1 = df[col].quantile(0.25)  # Calculăm Q1
-    Q3 = df[col].quantile(0.75)  # Calculăm Q3
-    IQR = Q3 - Q1  # Intervalul intercuartilic
-    lower_bound = Q1 - 1.5 * IQR # Limita inferioară
-    upper_bound = Q3 + 1.5 * IQR # Limita superioară
-    outliers_df = df[(df[col] < lower_bound) | (df[col] > upper_bound)]  # Selectăm outlierii
-    return lower_bound, upper_bound, outliers_df
-
 # Coloane relevante pe care le-ai menționat
 relevant_cols = [
     'artist_count',
@@ -174,22 +186,39 @@ relevant_cols = [
 
 
 
-# Calculăm outlieri pentru fiecare coloană relevantă
-for col in relevant_cols:
-    if col in df_clean.columns:
-        st.markdown(f"###  Coloana: `{col}`")
+# Outlierii tuturor coloanelor relevante odată (matrice booleană), cu cuartilele din profil
+present_cols = [col for col in relevant_cols if col in df_clean.columns]
+methods = ['iqr', 'mad']
+if st.checkbox("Include și IsolationForest (multivariat, rulează în paralel)"):
+    methods.append('isolation_forest')
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def get_outliers(_df, version, columns, methods, _profile):
+    # IsolationForest se antrenează o singură dată per versiune a datelor și set de metode, nu la fiecare rerulare
+    return detect_outliers(_df, list(columns), methods=list(methods), profile=_profile, n_jobs=-1)
+
+
+outliers = get_outliers(df_clean, (data_version, 'filled'), tuple(present_cols), tuple(methods), profile_clean)
+outlier_counts = outliers.masks['iqr'].sum()
 
-        # Detectare outlieri
-        lower, upper, outliers = find_outliers_iqr(df_clean, col)
-        st.write(f"🔹 Limita inferioară: `{lower:,.0f}`")
-        st.write(f"🔹 Limita superioară: `{upper:,.0f}`")
-        st.write(f"🔹 Număr de outlieri: `{len(outliers)}` din `{len(df_clean)}`")
+st.markdown("#### Număr de outlieri per metodă")
+st.dataframe(outliers.counts(), use_container_width=True)
 
-        # Boxplot interactiv cu Plotly
-        fig_box = px.box(df_clean, y=col)
-        st.plotly_chart(fig_box, use_container_width=True)
+for col in present_cols:
+    st.markdown(f"###  Coloana: `{col}`")
 
-        st.markdown("---")
+    # Detectare outlieri
+    lower, upper = outliers.bounds.loc[col, ['lower', 'upper']]
+    st.write(f"🔹 Limita inferioară: `{lower:,.0f}`")
+    st.write(f"🔹 Limita superioară: `{upper:,.0f}`")
+    st.write(f"🔹 Număr de outlieri: `{outlier_counts[col]}` din `{len(df_clean)}`")
+
+    # Boxplot interactiv cu Plotly
+    fig_box = px.box(df_clean, y=col)
+    st.plotly_chart(fig_box, use_container_width=True)
+
+    st.markdown("---")
 
 st.write("""
 ### Tratare outliers -> Aplicarea Logaritmicii
@@ -210,58 +239,46 @@ df['in_spotify_playlists_log'] = np.log1p(df['in_spotify_playlists'])
 df['in_deezer_playlists_log'] = np.log1p(df['in_deezer_playlists'])
 df['in_shazam_charts_log'] = np.log1p(df['in_shazam_charts'])
 
-fig, axes = plt.subplots(4, 2, figsize=(14, 12))
-
-# Before and After for 'streams'
-sns.histplot(df['streams'], kde=True, ax=axes[0, 0], color='blue')
-axes[0, 0].set_title('Distribuția înainte de logaritmică: streams')
-
-sns.histplot(df['streams_log'], kde=True, ax=axes[0, 1], color='orange')
-axes[0, 1].set_title('Distribuția după logaritmică: streams')
-
-# Before and After for 'in_spotify_playlists'
-sns.histplot(df['in_spotify_playlists'], kde=True, ax=axes[1, 0], color='blue')
-axes[1, 0].set_title('Distribuția înainte de logaritmică: in_spotify_playlists')
+LOG_COLUMNS = ['streams', 'in_spotify_playlists', 'in_deezer_playlists', 'in_shazam_charts']
 
-sns.histplot(df['in_spotify_playlists_log'], kde=True, ax=axes[1, 1], color='orange')
-axes[1, 1].set_title('Distribuția după logaritmică: in_spotify_playlists')
 
-# Before and After for 'in_deezer_playlists'
-sns.histplot(df['in_deezer_playlists'], kde=True, ax=axes[2, 0], color='blue')
-axes[2, 0].set_title('Distribuția înainte de logaritmică: in_deezer_playlists')
+def draw_log_histograms(df):
+    fig = new_figure((14, 12))
+    axes = fig.subplots(4, 2)
+    # Înainte și după logaritmică, pentru fiecare variabilă
+    for row, col in enumerate(LOG_COLUMNS):
+        sns.histplot(df[col], kde=True, ax=axes[row, 0], color='blue')
+        axes[row, 0].set_title(f'Distribuția înainte de logaritmică: {col}')
 
-sns.histplot(df['in_deezer_playlists_log'], kde=True, ax=axes[2, 1], color='orange')
-axes[2, 1].set_title('Distribuția după logaritmică: in_deezer_playlists')
+        sns.histplot(df[f'{col}_log'], kde=True, ax=axes[row, 1], color='orange')
+        axes[row, 1].set_title(f'Distribuția după logaritmică: {col}')
 
-# Before and After for 'in_shazam_charts'
-sns.histplot(df['in_shazam_charts'], kde=True, ax=axes[3, 0], color='blue')
-axes[3, 0].set_title('Distribuția înainte de logaritmică: in_shazam_charts')
+    # Ajustăm aspectul pentru a nu se suprapune subgrafurile
+    fig.tight_layout()
+    return fig
 
-sns.histplot(df['in_shazam_charts_log'], kde=True, ax=axes[3, 1], color='orange')
-axes[3, 1].set_title('Distribuția după logaritmică: in_shazam_charts')
-
-# Ajustăm aspectul pentru a nu se suprapune subgrafurile
-plt.tight_layout()
 
 # Afișăm figura
-st.pyplot(fig)
-
-output_file = "data/data_cleaned_spotify.csv"
+log_data = df[LOG_COLUMNS + [f'{col}_log' for col in LOG_COLUMNS]]
+figures.add(st.empty(), "na_log_histograms", data_version,
+            partial(draw_log_histograms, log_data))
 
-# Crearea folderului 'data' dacă nu există deja
-os.makedirs(os.path.dirname(output_file), exist_ok=True)
-
-# Salvarea DataFrame-ului curat într-un fișier Excel
-df_clean.to_csv(output_file, index=False)
+# Fișierul curățat (data/data_cleaned_spotify.csv) este generat de pipeline.py, nu de această pagină
 
 numerical_cols = df_clean.select_dtypes(include=[np.number]).columns
 corr_matrix = df_clean[numerical_cols].corr()
 
 # Vizualizăm matricea de corelație cu un heatmap
-plt.figure(figsize=(10, 8))
-sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', fmt=".2f")
-plt.title("Matricea de corelație pentru variabilele numerice")
-plt.tight_layout()
-plt.show()
-
-st.pyplot(plt)
+def draw_correlation(corr_matrix):
+    fig = new_figure((10, 8))
+    ax = fig.subplots()
+    sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', fmt=".2f", ax=ax)
+    ax.set_title("Matricea de corelație pentru variabilele numerice")
+    fig.tight_layout()
+    return fig
+
+figures.add(st.empty(), "na_correlation", data_version, partial(draw_correlation, corr_matrix),
+            columns=list(numerical_cols))
+
+# Figurile care nu erau în cache sunt desenate acum, în paralel, în locurile rezervate mai sus
+figures.flush()
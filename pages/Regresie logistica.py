@@ -2,9 +2,12 @@ from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report, confusion_matrix, roc_curve, auc
 import streamlit as st
+from data_loader import load_dataset
+from features import FEATURE_COLS, dataset_hash, get_feature_matrix
+from model_registry import ModelArtifact, get_or_train
+from regression import SUCCESS_LABELS, categorize_streams, search_logistic
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler, LabelEncoder
 import matplotlib.pyplot as plt
 import seaborn as sns
 
@@ -15,30 +18,21 @@ st.markdown("""
 Această aplicație permite scalarea și clusterizarea pieselor muzicale folosind KMeans.
 """)
 
-# Încarcă direct fișierul CSV dintr-o cale fixă
+# Selectezi feature-urile (X) și ținta (y)
+feature_cols = FEATURE_COLS  # setul comun de caracteristici (features.py)
+
+# Încarcă direct fișierul CSV dintr-o cale fixă (doar coloanele folosite în pagină)
 csv_path = "data/data_with_encoding.csv"
 
 try:
-    df = pd.read_csv(csv_path)
+    df = load_dataset(csv_path, columns=feature_cols + ['streams'])
     st.success("Fișierul a fost încărcat cu succes!")
 except FileNotFoundError:
     st.error(f"Fișierul '{csv_path}' nu a fost găsit. Verifică dacă calea este corectă.")
     st.stop()
 
-# Funcție de categorizare a succesului pe baza numărului de streamuri
-def categorize_streams(value):
-    if value >= 700_000_000:
-        return "Very High"
-    elif value >= 500_000_000:
-        return "High"
-    elif value >= 300_000_000:
-        return "Mid"
-    elif value >= 150_000_000:
-        return "Low"
-    else:
-        return "Very Low"
-
-df['success_category'] = df['streams'].apply(categorize_streams)
+# Categorizarea succesului pe baza numărului de streamuri (categorial ordonat, Very Low → Very High)
+df['success_category'] = categorize_streams(df['streams'])
 
 # Afișează distribuția categoriilor de succes
 st.subheader("📊 Distribuția categoriilor de succes")
@@ -46,24 +40,14 @@ success_counts = df['success_category'].value_counts().sort_index()
 st.bar_chart(success_counts)
 st.write(success_counts)
 
-# Encoder pentru etichete
-label_encoder = LabelEncoder()
-df['success_label'] = label_encoder.fit_transform(df['success_category'])
+# Etichetele numerice sunt codurile categoriilor, deci păstrează ordinea Very Low → Very High
+class_names = list(SUCCESS_LABELS)
+df['success_label'] = df['success_category'].cat.codes
 
 # Afișează corespondentele între categorii și etichete
-label_map = dict(zip(label_encoder.classes_, label_encoder.transform(label_encoder.classes_)))
+label_map = {name: code for code, name in enumerate(class_names)}
 st.write("Corespondență categorii → labeluri:", label_map)
 
-# Selectezi feature-urile (X) și ținta (y)
-feature_cols = [
-    'bpm', 'key_encoded', 'mode_encoded', 'danceability_%', 'valence_%',
-    'energy_%', 'acousticness_%', 'liveness_%', 'speechiness_%',
-    'in_spotify_playlists', 'in_spotify_charts',
-    'in_apple_playlists', 'in_apple_charts',
-    'in_deezer_playlists', 'in_deezer_charts',
-    'in_shazam_charts', 'genre_freq_encoded', 'country_list_encoded',
-    'released_month', 'released_year', 'released_day', 'artist_count'
-]
 
 # Verificare că toate coloanele există
 missing_cols = [col for col in feature_cols if col not in df.columns]
@@ -71,32 +55,64 @@ if missing_cols:
     st.error(f"Coloanele lipsă: {missing_cols}")
     st.stop()
 
-X = df[feature_cols]
 y = df['success_label']
 
-# Scalează datele
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
+# Datele scalate (float32), partajate cu celelalte pagini pentru aceleași date
+features = get_feature_matrix(df, feature_cols)
+X_scaled = features.X
+scaler = features.scaler
 
 # Împarte în train și test
 X_train, X_test, y_train, y_test = train_test_split(
     X_scaled, y, test_size=0.2, random_state=42, stratify=y)
 
-# Antrenare model regresie logistică
-model = LogisticRegression(multi_class='multinomial', solver='lbfgs', max_iter=1000)
-model.fit(X_train, y_train)
+# Modul de antrenare: un singur model sau căutarea hiperparametrilor prin validare încrucișată
+training_mode = st.radio(
+    "Mod de antrenare",
+    ["Model simplu (lbfgs, C=1)", "Validare încrucișată (căutare C / penalty / solver)"],
+    horizontal=True,
+)
+
+if training_mode.startswith("Validare"):
+    # Fold-urile rulează în paralel pe toate nucleele; rezultatele sunt păstrate în cache pe disc
+    cv_results, best_params = search_logistic(X_train, y_train.to_numpy(), cv=5)
+    st.subheader("🔎 Rezultatele validării încrucișate (5 fold-uri)")
+    st.dataframe(cv_results.round(4), use_container_width=True)
+    best = cv_results.iloc[0]
+    st.write(
+        f"Cel mai bun model: solver=`{best_params['solver']}`, penalty=`{best_params['penalty']}`, "
+        f"C=`{best_params['C']:g}` — acuratețe {best['mean']:.3f} "
+        f"(IC 95%: {best['ci_low']:.3f} – {best['ci_high']:.3f})"
+    )
+    model_params = dict(max_iter=1000, **best_params)
+else:
+    # Antrenare model regresie logistică
+    model_params = dict(multi_class='multinomial', solver='lbfgs', max_iter=1000)
+
+
+def train_model():
+    model = LogisticRegression(**model_params)
+    model.fit(X_train, y_train)
+    return ModelArtifact("logistic_success", "", model, scaler, list(feature_cols), class_names,
+                         metrics={'accuracy': float(model.score(X_test, y_test))})
+
+
+# Modelul e încărcat din registru dacă a fost deja antrenat pe aceleași date cu aceiași parametri
+artifact = get_or_train("logistic_success", dataset_hash(df, feature_cols + ['streams']),
+                        {**model_params, 'classes': class_names}, train_model)
+model = artifact.estimator
 
 # Predicții pe datele de test
 y_pred = model.predict(X_test)
 
 # Matricea de confuzie
 st.subheader("📈 Matrice de Confuzie")
-conf_matrix = confusion_matrix(y_test, y_pred)
+conf_matrix = confusion_matrix(y_test, y_pred, labels=range(len(class_names)))
 st.write(conf_matrix)
 
 # Vizualizarea matricei de confuzie cu ajutorul unui heatmap
 fig, ax = plt.subplots(figsize=(7, 3))
-sns.heatmap(conf_matrix, annot=True, fmt='d', cmap="Blues", xticklabels=label_encoder.classes_, yticklabels=label_encoder.classes_, ax=ax)
+sns.heatmap(conf_matrix, annot=True, fmt='d', cmap="Blues", xticklabels=class_names, yticklabels=class_names, ax=ax)
 ax.set_title('Matricea de Confuzie')
 ax.set_xlabel('Predicții')
 ax.set_ylabel('Realitate')
@@ -104,7 +120,8 @@ st.pyplot(fig)
 
 # Raport de clasificare
 st.subheader("📋 Raport de clasificare")
-report = classification_report(y_test, y_pred, target_names=label_encoder.classes_, output_dict=True)
+report = classification_report(y_test, y_pred, labels=range(len(class_names)), target_names=class_names,
+                               output_dict=True, zero_division=0)
 st.dataframe(pd.DataFrame(report).transpose())
 
 # Calcularea și afișarea curbei ROC și AUC
@@ -1,12 +1,15 @@
 import streamlit as st
+from data_loader import load_dataset
+from features import FEATURE_COLS, dataset_hash, get_feature_matrix
+from benchmark import load_results, run_benchmark
+from model_registry import ModelArtifact, get_or_train
+from regression import categorize_streams, fit_ols, ols_inference
 import pandas as pd
 import numpy as np
 import statsmodels.api as sm
 import seaborn as sns
 import matplotlib.pyplot as plt
-from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
 
 # Setări inițiale
 st.set_page_config(page_title="Regresie Multiplă", layout="wide")
@@ -18,49 +21,30 @@ Această aplicație construiește un model de regresie multiplă pentru a prezic
 # Încarcă fișierul CSV
 csv_path = "data/data_with_encoding.csv"
 try:
-    df = pd.read_csv(csv_path)
+    df = load_dataset(csv_path)
     st.success("Fișierul a fost încărcat cu succes!")
 except FileNotFoundError:
     st.error(f"Fișierul '{csv_path}' nu a fost găsit. Verifică dacă calea este corectă.")
     st.stop()
 
-# Funcție pentru a categoriza succesul piesei în funcție de numărul de streamuri
-def categorize_streams(value):
-    if value >= 700_000_000:
-        return "Very High"
-    elif value >= 500_000_000:
-        return "High"
-    elif value >= 300_000_000:
-        return "Mid"
-    elif value >= 150_000_000:
-        return "Low"
-    else:
-        return "Very Low"
-
-# Categorizarea succesului piesei
-df['success_category'] = df['streams'].apply(categorize_streams)
+# Categorizarea succesului piesei (categorial ordonat, Very Low → Very High)
+df['success_category'] = categorize_streams(df['streams'])
 
-# Encoding etichete
-label_encoder = LabelEncoder()
-df['success_label'] = label_encoder.fit_transform(df['success_category'])
+# Etichetele numerice sunt codurile categoriilor, în ordinea succesului
+df['success_label'] = df['success_category'].cat.codes
 
 df_numeric = df.drop(columns=['track_name']).select_dtypes(include=[np.number])
 correlation_matrix = df_numeric.corr()
 st.subheader("📈 Matrice de corelație")
 st.write(correlation_matrix)
 
+# Rândurile complete; matricea de caracteristici e construită pe tot setul, ca să fie partajată cu celelalte pagini
+df_all = df
+valid_rows = df.notna().all(axis=1).to_numpy()
 df = df.dropna()
 
 # Selectează caracteristicile pentru modelul de regresie multiplă
-feature_cols = [
-    'bpm', 'key_encoded', 'mode_encoded', 'danceability_%', 'valence_%',
-    'energy_%', 'acousticness_%', 'liveness_%', 'speechiness_%',
-    'in_spotify_playlists', 'in_spotify_charts',
-    'in_apple_playlists', 'in_apple_charts',
-    'in_deezer_playlists', 'in_deezer_charts',
-    'in_shazam_charts', 'genre_freq_encoded', 'country_list_encoded',
-    'released_month', 'released_year', 'released_day', 'artist_count'
-]
+feature_cols = FEATURE_COLS  # setul comun de caracteristici (features.py)
 
 # Verificare dacă există coloană lipsă
 missing_cols = [col for col in feature_cols if col not in df.columns]
@@ -68,29 +52,41 @@ if missing_cols:
     st.error(f"Coloanele lipsă: {missing_cols}")
     st.stop()
 
-X = df[feature_cols]
 y = df['streams']  # folosim 'streams' pentru succesul piesei
 
-# Scalează datele
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
+# Datele scalate (float32); selectăm rândurile complete doar dacă există rânduri eliminate
+features = get_feature_matrix(df_all, feature_cols)
+X_scaled = features.X if valid_rows.all() else features.X[valid_rows]
 
 # Împărțirea datelor în seturi de train și test
 X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
 
-# Adaugă o coloană de intercept (constantă) pentru regresia multiplă
-X_train_sm = sm.add_constant(X_train)
-X_test_sm = sm.add_constant(X_test)
+data_hash = dataset_hash(df, feature_cols + ['streams'])
+
+# Creează modelul de regresie multiplă prin QR (sau îl încarcă din registru dacă datele nu s-au schimbat)
+def train_model():
+    model = fit_ols(X_train, y_train, names=feature_cols)
+    return ModelArtifact("ols_streams", "", model, features.scaler, list(feature_cols))
 
-# Creează modelul de regresie multiplă
-model = sm.OLS(y_train, X_train_sm).fit()
 
-# Afișează sumarul modelului
+artifact = get_or_train("ols_streams", data_hash, {'test_size': 0.2, 'solver': 'qr'}, train_model)
+model = artifact.estimator
+
+# Afișează coeficienții modelului
 st.subheader("📊 Rezultatele modelului de regresie multiplă")
-st.write(model.summary())
+st.dataframe(pd.DataFrame({'coef': model.params}, index=model.names), use_container_width=True)
+
+# Statisticile de inferență sunt costisitoare: se calculează doar la cerere (și se păstrează per versiune a datelor)
+with st.expander("📑 Sumar complet (p-valori, diagnostice, VIF)"):
+    if st.checkbox("Calculează statisticile de inferență"):
+        coefficients, diagnostics = ols_inference(model, X_train, y_train, data_hash)
+        st.dataframe(coefficients.round(4), use_container_width=True)
+        st.dataframe(pd.Series(diagnostics, name='valoare').to_frame(), use_container_width=True)
+    if st.checkbox("Afișează și sumarul statsmodels"):
+        st.write(sm.OLS(y_train, sm.add_constant(X_train)).fit().summary(xname=model.names))
 
 # Prezice pe setul de test
-y_pred = model.predict(X_test_sm)
+y_pred = model.predict(X_test)
 
 # Vizualizare rezultatelor: Prețul prezis vs. Prețul real
 st.subheader("📈 Compararea valorilor prezise cu cele reale")
@@ -114,6 +110,20 @@ ax.set_xlabel('Reziduuri')
 ax.set_title('Distribuția Reziduurilor')
 st.pyplot(fig)
 
+# Comparația cu alte modele (benchmark.py): cost de antrenare/predicție și acuratețe
+with st.expander("⏱️ Benchmark: OLS, ridge, lasso și gradient boosting"):
+    benchmark_results, benchmark_hash = load_results()
+    if st.button("Rulează benchmark-ul"):
+        with st.spinner("Se antrenează modelele..."):
+            benchmark_results = run_benchmark(df)
+        benchmark_hash = data_hash
+    if benchmark_results is None:
+        st.info("Nu există rezultate salvate. Apasă butonul sau rulează `python benchmark.py`.")
+    else:
+        if benchmark_hash != data_hash:
+            st.warning("Rezultatele salvate au fost obținute pe o altă versiune a datelor.")
+        st.caption("Variantele *_log sunt antrenate pe log1p(streams); MAE și R² sunt pe scara originală.")
+        st.dataframe(benchmark_results.round(4), use_container_width=True)
 
 
 st.subheader("📊 Corelațiile între variabilele explicative")
@@ -1,8 +1,11 @@
 import streamlit as st
+from data_loader import load_dataset
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
+from clustering import (MAX_PLOT_POINTS, STREAMING_ROW_THRESHOLD, SWEEP_SAMPLE_ROWS, KMeansModelStore,
+                        stratified_sample)
+from features import FEATURE_COLS, get_feature_matrix
+from data_loader import count_rows, dataset_version, iter_chunks, read_sample, take_rows
 import matplotlib.pyplot as plt
 import seaborn as sns
 
@@ -13,57 +16,132 @@ st.markdown("""
 Această aplicație permite scalarea și clusterizarea pieselor muzicale folosind KMeans.
 """)
 
-# Încarcă direct fișierul CSV dintr-o cale fixă
+# Coloane numerice pentru clustering (setul comun de caracteristici, definit în features.py)
+numeric_cols = FEATURE_COLS
+
+# Încarcă direct fișierul CSV dintr-o cale fixă (doar coloanele folosite în pagină)
 csv_path = "data/data_with_encoding.csv"
+display_cols = ['track_name', 'artist(s)_name', 'streams']
 
+# Pentru cataloage mari folosim clusterizarea streaming (MiniBatchKMeans pe bucăți din fișier);
+# decizia se ia din numărul de rânduri, înainte de a încărca ceva în memorie
 try:
-    df = pd.read_csv(csv_path)
-    st.success("Fișierul a fost încărcat cu succes!")
+    n_rows = count_rows(csv_path)
+    use_streaming = n_rows > STREAMING_ROW_THRESHOLD
+    if use_streaming:
+        available_cols = read_sample(csv_path).columns
+        st.success("Set de date mare: fișierul va fi parcurs pe bucăți.")
+    else:
+        df = load_dataset(csv_path, columns=numeric_cols + display_cols)
+        available_cols = df.columns
+        st.success("Fișierul a fost încărcat cu succes!")
 except FileNotFoundError:
     st.error(f"Fișierul '{csv_path}' nu a fost găsit. Verifică dacă calea este corectă.")
     st.stop()
 
-
-
-
-# Coloane numerice pentru clustering
-numeric_cols = [
-    'bpm', 'key_encoded', 'mode_encoded', 'danceability_%', 'valence_%',
-    'energy_%', 'acousticness_%', 'liveness_%', 'speechiness_%',
-    'in_spotify_playlists', 'in_spotify_charts',
-    'in_apple_playlists', 'in_apple_charts',
-    'in_deezer_playlists', 'in_deezer_charts',
-    'in_shazam_charts', 'genre_freq_encoded', 'country_list_encoded', 'released_month', 'released_year', 'released_day', 'artist_count'
-]
-
-
-
 # Verifică dacă toate coloanele există
-missing_cols = [col for col in numeric_cols if col not in df.columns]
+missing_cols = [col for col in numeric_cols if col not in available_cols]
 if missing_cols:
     st.error(f"Următoarele coloane lipsesc: {missing_cols}")
     st.stop()
 
-# Selectează coloanele numerice
-X = df[numeric_cols]
 
-# Scalează datele
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
+@st.cache_resource
+def get_model_store():
+    # Un singur store per proces: modelele rămân în memorie între rerulări și sesiuni
+    return KMeansModelStore()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def get_display_rows(path, version, columns, positions):
+    # Doar rândurile afișate (exemple și punctele din grafic), citite pe bucăți
+    return take_rows(path, list(columns), positions)
+
+
+# PCA și modelele KMeans sunt păstrate în cache după (hash date, coloane, k)
+model_store = get_model_store()
+
+if use_streaming:
+    # În modul streaming cheia modelelor este versiunea fișierului (cale + mtime), nu hash-ul conținutului
+    data_version = dataset_version(csv_path)
+    chunks = lambda: iter_chunks(csv_path, numeric_cols)
+else:
+    # Matricea scalată (float32), partajată cu paginile de regresie pentru aceleași date
+    features = get_feature_matrix(df, numeric_cols)
+    model_store.precompute(features)
+
+
+def sweep_sample():
+    # Rânduri alese aleator din tot fișierul, citite pe bucăți
+    rng = np.random.default_rng(42)
+    positions = np.sort(rng.choice(n_rows, size=min(n_rows, SWEEP_SAMPLE_ROWS), replace=False))
+    return take_rows(csv_path, numeric_cols, positions)
+
+
+# Ghid pentru alegerea lui k: elbow (inerție) și silhouette, calculate în paralel și păstrate în cache.
+# Corpul unui expander rulează la fiecare încărcare, deci calculul pornește doar la cerere.
+with st.expander("📉 Alegerea numărului de clustere (elbow / silhouette)"):
+    if st.checkbox("Calculează elbow / silhouette pentru k = 2..10"):
+        if use_streaming:
+            sweep_df = model_store.streaming_sweep(sweep_sample, data_version, numeric_cols)
+            st.caption(f"Calculat pe un eșantion aleator de {min(n_rows, SWEEP_SAMPLE_ROWS):,} rânduri.")
+        else:
+            sweep_df = model_store.sweep(features)
+        fig_sweep, (ax_elbow, ax_sil) = plt.subplots(1, 2, figsize=(10, 3))
+        ax_elbow.plot(sweep_df.index, sweep_df['inertia'], marker='o')
+        ax_elbow.set_title("Metoda elbow (inerție)")
+        ax_elbow.set_xlabel("k")
+        ax_sil.plot(sweep_df.index, sweep_df['silhouette'], marker='o', color='green')
+        ax_sil.set_title("Scor silhouette")
+        ax_sil.set_xlabel("k")
+        plt.tight_layout()
+        st.pyplot(fig_sweep)
+        st.dataframe(sweep_df.round(3), use_container_width=True)
+        st.caption(f"Cel mai bun k după silhouette: {sweep_df['silhouette'].idxmax()}")
 
 # Selectează numărul de clustere
 n_clusters = st.slider("Selectează numărul de clustere", 2, 10, 4)
 
-# Aplică KMeans
-kmeans = KMeans(n_clusters=n_clusters, random_state=42)
-cluster_labels = kmeans.fit_predict(X_scaled)
+# Aplică KMeans (din cache, dacă modelul pentru acest k a fost deja antrenat)
+if use_streaming:
+    result = model_store.get_streaming(chunks, data_version, numeric_cols, n_clusters)
+    st.info(
+        f"Set de date mare: s-a folosit MiniBatchKMeans în mod streaming "
+        f"({result.n_epochs} epoci, {'convergent' if result.converged else 'fără convergență'}, "
+        f"inerție {result.inertia:,.0f})."
+    )
+else:
+    result = model_store.get(features, n_clusters)
+cluster_labels = result.labels
+
+# Proiecția PCA 2D (calculată o singură dată, independent de numărul de clustere)
+if use_streaming:
+    projection = model_store.streaming_projection(chunks, data_version, numeric_cols, result.scaler)
+else:
+    projection = model_store.projection(features)
+
+# Pentru afișare desenăm cel mult MAX_PLOT_POINTS puncte, păstrând proporțiile clusterelor
+plot_idx = stratified_sample(cluster_labels, MAX_PLOT_POINTS)
 
 # Adaugă rezultatul în DataFrame
-df['cluster'] = cluster_labels
+if use_streaming:
+    # Citim doar coloanele afișate, pentru punctele din grafic și primele 3 piese din fiecare cluster
+    example_idx = np.concatenate([np.flatnonzero(cluster_labels == i)[:3] for i in range(n_clusters)])
+    display_present = tuple(col for col in display_cols if col in available_cols)
+    df = get_display_rows(csv_path, data_version, display_present, np.union1d(plot_idx, example_idx)).copy()
+    df['cluster'] = cluster_labels[df.index]
+    # Media fiecărui cluster este centrul său, readus la scara originală
+    cluster_means = pd.DataFrame(result.scaler.inverse_transform(result.centers), columns=numeric_cols)
+    cluster_means.index.name = 'cluster'
+    plot_df = df.loc[plot_idx]
+else:
+    df['cluster'] = cluster_labels
+    cluster_means = df.groupby('cluster')[numeric_cols].mean()
+    plot_df = df
 
 # Afișează câteva exemple
 st.subheader("🔍 Exemple de înregistrări după clusterizare")
-cols_to_show = ['track_name', 'streams', 'cluster']
+cols_to_show = ['track_name', 'artist(s)_name', 'streams', 'cluster']
 cols_present = [col for col in cols_to_show if col in df.columns]
 for i in range(n_clusters):
     st.markdown(f"### Exemple din Clusterul {i}")
@@ -84,17 +162,10 @@ for i in range(n_clusters):
 #         st.write("✅ Toate coloanele numerice au fost incluse.")
 
 st.subheader("📌 Caracteristici medii per cluster")
-st.dataframe(df.groupby('cluster')[numeric_cols].mean().round(2))
+st.dataframe(cluster_means.round(2))
 
-from sklearn.decomposition import PCA
-
-# PCA pentru proiecție 2D
-pca = PCA(n_components=2)
-X_pca = pca.fit_transform(X_scaled)
-
-# Exemplu înregistrări
-cols_to_show = ['track_name', 'artist_name', 'streams', 'cluster']
-cols_present = [col for col in cols_to_show if col in df.columns]
+X_pca = projection.X_pca[plot_idx]
+plot_labels = cluster_labels[plot_idx]
 
 # Vizualizare PCA 2D – dimensiune mai mică
 st.subheader("🎯 Vizualizare 2D a clusterelor (PCA)")
@@ -102,7 +173,7 @@ fig, ax = plt.subplots(figsize=(7, 3))
 cmap = plt.cm.get_cmap('rainbow', n_clusters)
 
 for cluster_id in range(n_clusters):
-    mask = cluster_labels == cluster_id
+    mask = plot_labels == cluster_id
     ax.scatter(
         X_pca[mask, 0],
         X_pca[mask, 1],
@@ -121,7 +192,7 @@ st.pyplot(fig)
 if 'streams' in df.columns:
     st.subheader("📊 Distribuția stream-urilor în funcție de cluster")
     fig2, ax2 = plt.subplots(figsize=(7, 3))  # <--- Dimensiune mai mică și aici
-    sns.boxplot(data=df, x='cluster', y='streams', ax=ax2)
+    sns.boxplot(data=plot_df, x='cluster', y='streams', ax=ax2)
     ax2.set_title("Streams per cluster")
     st.pyplot(fig2)
 
@@ -2,6 +2,7 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import io
+from data_loader import load_csv
 
 
 st.set_page_config(page_title="Vizualizari", layout="wide")
@@ -22,7 +23,7 @@ st.markdown(
 st.markdown('<h1 class="custom-title">Vizualiari folosind Streamlit</h1>', unsafe_allow_html=True)
 
 # Încarcă datele
-df = pd.read_csv("data/spotify-2023-updated.csv", encoding="ISO-8859-1")
+df = load_csv("data/spotify-2023-updated.csv", encoding="ISO-8859-1")
 
 # --- SECTIUNEA 1: Vizualizari GENERALE (tip portret, cu coloane) ---
 st.subheader("Vizualizări generale")
@@ -108,13 +109,8 @@ st.markdown("""
 | `genre`                   | object     | Genul muzical                                                                            | 🔸 Codificare necesară    |
 """, unsafe_allow_html=True)
 
-def convert_numeric_columns(df):
-    df['streams'] = df['streams'].astype(str).str.replace(',', '').astype(float)
-    df['in_deezer_playlists'] = df['in_deezer_playlists'].astype(str).str.replace(',', '').astype(int)
-    df['in_shazam_charts'] = pd.to_numeric(df['in_shazam_charts'], errors='coerce')
-    return df
-
-df = convert_numeric_columns(df)
+# Conversia este făcută o singură dată, la încărcare, și păstrată în cache
+df = load_csv("data/spotify-2023-updated.csv", encoding="ISO-8859-1", convert_numeric=True)
 
 
 st.markdown("""
@@ -0,0 +1,241 @@
+"""
+Pipeline-ul de preprocesare a datelor.
+
+Etapele care înainte rulau în pagini (și rescriau CSV-urile la fiecare afișare) sunt
+definite aici ca un graf de dependențe. Fiecare etapă se reconstruiește doar dacă
+hash-ul conținutului fișierelor de intrare s-a schimbat sau dacă fișierul de ieșire lipsește.
+Pe lângă CSV, fiecare etapă scrie și un artefact Parquet în data/artifacts/ (dacă pyarrow
+este instalat), citit de pagini prin data_loader.load_dataset.
+
+Utilizare:
+    python pipeline.py                 # rulează etapele învechite
+    python pipeline.py --force         # reconstruiește tot
+    python pipeline.py encoding        # rulează doar etapa 'encoding' (și dependențele ei)
+"""
+import argparse
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Callable, List
+
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+
+from artist_index import build_artist_index, country_lists
+from data_loader import HAS_PYARROW, artifact_path, convert_numeric_columns, save_artifact
+from geo_utils import (ADJACENCY_CSV, CENTROIDS_CSV, COUNTRIES_SHP, TRACK_DISTANCES_CSV, collaboration_distances,
+                       country_adjacency, country_centroids, distance_summary, read_countries, track_coordinates)
+from outliers import detect_outliers
+
+STATE_FILE = "data/.pipeline_state.json"
+
+# Fișierul sursă și data_with_country_list.csv au fost citite mereu ca ISO-8859-1 (ca în pagini);
+# păstrăm această codificare ca fișierele intermediare regenerate să fie identice cu cele din data/
+SOURCE_ENCODING = "ISO-8859-1"
+
+
+@dataclass
+class Stage:
+    name: str
+    inputs: List[str]
+    output: str
+    build: Callable
+    version: int = 1  # se incrementează când se schimbă logica etapei
+
+
+# --- Etapele pipeline-ului ---
+
+def build_cleaned(inputs):
+    """Tratarea valorilor lipsă (moda pentru 'key', mediana pentru 'in_shazam_charts')."""
+    df = pd.read_csv(inputs[0], encoding=SOURCE_ENCODING)
+    df.columns = df.columns.str.strip()
+    convert_numeric_columns(df)
+
+    df['key'] = df['key'].fillna(df['key'].mode()[0])
+    df['in_shazam_charts'] = df['in_shazam_charts'].fillna(df['in_shazam_charts'].median())
+    if 'instrumentalness_%' in df.columns:
+        df = df.drop(columns=['instrumentalness_%'])
+    return df
+
+
+def build_track_artists(inputs):
+    """Tabela de legătură piesă <-> artist (vezi artist_index.py)."""
+    df = pd.read_csv(inputs[0], encoding="utf-8")
+    df.columns = df.columns.str.strip()
+    return build_artist_index(df)
+
+
+def build_country_list(inputs):
+    """Adaugă coloana 'country_list' pe baza țării fiecărui artist (join pe tabela de legătură)."""
+    df = pd.read_csv(inputs[0], encoding="utf-8")
+    artist_data = pd.read_csv(inputs[1], encoding="utf-8")
+    bridge = pd.read_csv(inputs[2], encoding="utf-8")
+    df.columns = df.columns.str.strip()
+    artist_data.columns = artist_data.columns.str.strip()
+
+    artist_data['country'] = artist_data['country'].fillna('Unknown').astype(str)
+    artist_country_mapping = artist_data.set_index('artist_name')['country'].to_dict()
+
+    df['country_list'] = country_lists(bridge, artist_country_mapping, len(df)).to_numpy()
+    return df
+
+
+def build_encoding(inputs):
+    """Label Encoding pentru 'key'/'mode' și Frequency Encoding pentru 'genre'/'country_list'."""
+    df = pd.read_csv(inputs[0], encoding=SOURCE_ENCODING)
+    df.columns = df.columns.str.strip()
+
+    le = LabelEncoder()
+    df['key_encoded'] = le.fit_transform(df['key'])
+    df['mode_encoded'] = le.fit_transform(df['mode'])
+    df['genre_freq_encoded'] = df['genre'].map(df['genre'].value_counts(normalize=True))
+    df['country_list_encoded'] = df['country_list'].map(df['country_list'].value_counts(normalize=True))
+    return df
+
+
+def build_country_centroids(inputs):
+    """Centroidul fiecărei țări din shapefile-ul Natural Earth."""
+    return country_centroids(read_countries(inputs[0]))
+
+
+def build_country_adjacency(inputs):
+    """Perechile de țări vecine (spatial join cu predicatul 'touches')."""
+    return country_adjacency(read_countries(inputs[0]))
+
+
+def build_track_distances(inputs):
+    """Distanța maximă/medie (km) dintre țările artiștilor fiecărei piese, ca variabile reutilizabile."""
+    df = pd.read_csv(inputs[0], encoding="utf-8")
+    centroids = pd.read_csv(inputs[1], encoding="utf-8")
+    df.columns = df.columns.str.strip()
+    distances = collaboration_distances(track_coordinates(df['country_list'], centroids))
+    summary = distance_summary(distances, df.index)
+    summary.insert(0, 'track_name', df['track_name'])
+    return summary
+
+
+def build_outlier_flags(inputs):
+    """Marcajele de outlier (IQR și MAD) pentru fiecare coloană numerică, plus 'any_outlier' per piesă."""
+    df = pd.read_csv(inputs[0], encoding="utf-8")
+    df.columns = df.columns.str.strip()
+    result = detect_outliers(df, methods=('iqr', 'mad'))
+    flags = pd.concat({method: mask for method, mask in result.masks.items()}, axis=1)
+    flags.columns = [f"{col}_{method}" for method, col in flags.columns]
+    flags.insert(0, 'track_name', df['track_name'])
+    flags['any_outlier'] = result.any()
+    return flags
+
+
+# Shapefile-ul e format din mai multe fișiere; geometria e în .shp, numele țărilor în .dbf
+COUNTRIES_FILES = [COUNTRIES_SHP, COUNTRIES_SHP.replace(".shp", ".dbf")]
+
+STAGES = [
+    Stage("cleaned", ["data/spotify-2023-updated.csv"], "data/data_cleaned_spotify.csv", build_cleaned,
+          version=2),
+    Stage("track_artists", ["data/data_cleaned_spotify.csv"], "data/track_artists.csv", build_track_artists),
+    Stage("country_list", ["data/data_cleaned_spotify.csv", "data/artists_data.csv", "data/track_artists.csv"],
+          "data/data_with_country_list.csv", build_country_list, version=2),
+    Stage("encoding", ["data/data_with_country_list.csv"], "data/data_with_encoding.csv", build_encoding,
+          version=2),
+    Stage("outlier_flags", ["data/data_cleaned_spotify.csv"], "data/outlier_flags.csv", build_outlier_flags),
+    Stage("country_centroids", COUNTRIES_FILES, CENTROIDS_CSV, build_country_centroids),
+    Stage("country_adjacency", COUNTRIES_FILES, ADJACENCY_CSV, build_country_adjacency),
+    Stage("track_distances", ["data/data_with_country_list.csv", CENTROIDS_CSV], TRACK_DISTANCES_CSV,
+          build_track_distances),
+]
+
+
+# --- Execuția incrementală ---
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _stage_key(stage):
+    # Cheia unei etape: versiunea logicii + hash-ul fiecărui fișier de intrare
+    return {"version": stage.version, "inputs": {path: file_hash(path) for path in stage.inputs}}
+
+
+def _load_state(state_file):
+    if os.path.exists(state_file):
+        with open(state_file, encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def _save_state(state, state_file):
+    os.makedirs(os.path.dirname(state_file), exist_ok=True)
+    with open(state_file, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+
+def _is_built(stage):
+    if not os.path.exists(stage.output):
+        return False
+    return not HAS_PYARROW or os.path.exists(artifact_path(stage.output))
+
+
+def _select_stages(targets):
+    """Returnează etapele cerute împreună cu dependențele lor, în ordine topologică."""
+    if not targets:
+        return list(STAGES)
+    by_output = {stage.output: stage for stage in STAGES}
+    by_name = {stage.name: stage for stage in STAGES}
+    unknown = [t for t in targets if t not in by_name]
+    if unknown:
+        raise ValueError(f"Etape necunoscute: {unknown}")
+
+    needed = set()
+    pending = [by_name[t] for t in targets]
+    while pending:
+        stage = pending.pop()
+        if stage.name not in needed:
+            needed.add(stage.name)
+            pending.extend(by_output[path] for path in stage.inputs if path in by_output)
+    return [stage for stage in STAGES if stage.name in needed]
+
+
+def run(targets=None, force=False, state_file=STATE_FILE, verbose=True):
+    """
+    Rulează pipeline-ul și reconstruiește doar etapele învechite.
+    STAGES este deja în ordine topologică, deci o etapă rulează după dependențele ei.
+    Returnează lista etapelor reconstruite.
+    """
+    state = _load_state(state_file)
+    rebuilt = []
+    for stage in _select_stages(targets):
+        key = _stage_key(stage)
+        if not force and state.get(stage.name) == key and _is_built(stage):
+            if verbose:
+                print(f"[{stage.name}] actualizat, se sare peste")
+            continue
+
+        if verbose:
+            print(f"[{stage.name}] se reconstruiește {stage.output}")
+        os.makedirs(os.path.dirname(stage.output), exist_ok=True)
+        df = stage.build(stage.inputs)
+        df.to_csv(stage.output, index=False)
+        save_artifact(df, stage.output)
+        state[stage.name] = key
+        _save_state(state, state_file)
+        rebuilt.append(stage.name)
+    return rebuilt
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline incremental de preprocesare a datelor Spotify")
+    parser.add_argument("stages", nargs="*", help=f"etapele de rulat ({', '.join(s.name for s in STAGES)})")
+    parser.add_argument("--force", action="store_true", help="reconstruiește etapele chiar dacă sunt actualizate")
+    args = parser.parse_args()
+
+    rebuilt = run(args.stages, force=args.force)
+    print(f"Etape reconstruite: {', '.join(rebuilt) if rebuilt else 'niciuna'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Profilul coloanelor unui set de date: valori lipsă, momente (medie, deviație standard, asimetrie,
+aplatizare), minim/maxim și cuartile, pentru toate coloanele numerice odată.
+
+profile_frame calculează totul vectorizat pe matricea coloanelor numerice (cuartile exacte).
+get_profile păstrează profilul în memorie per versiune a datelor (fișierul sursă și etapa de
+prelucrare), deci paginile care îl cer pentru aceleași date îl calculează o singură dată.
+"""
+import threading
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+QUANTILES = (0.25, 0.5, 0.75)
+QUANTILE_COLUMNS = ['q25', 'q50', 'q75']
+
+
+@dataclass
+class Moments:
+    """Numărul de valori nenule, media și sumele puterilor abaterilor (M2, M3, M4), per coloană."""
+    n: np.ndarray
+    mean: np.ndarray
+    m2: np.ndarray
+    m3: np.ndarray
+    m4: np.ndarray
+
+    @classmethod
+    def from_array(cls, X):
+        valid = ~np.isnan(X)
+        n = valid.sum(axis=0).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(valid, X, 0.0).sum(axis=0) / n
+        d = np.where(valid, X - mean, 0.0)
+        d2 = d * d
+        return cls(n, mean, d2.sum(axis=0), (d2 * d).sum(axis=0), (d2 * d2).sum(axis=0))
+
+    def std(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.n > 1, np.sqrt(self.m2 / (self.n - 1)), np.nan)
+
+    def skew(self):
+        """Asimetria ajustată (ca pandas.Series.skew)."""
+        n = self.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            g1 = np.sqrt(n * (n - 1)) / (n - 2) * (self.m3 / n) / (self.m2 / n) ** 1.5
+        return np.where(n < 3, np.nan, np.where(self.m2 == 0, 0.0, g1))
+
+    def kurtosis(self):
+        """Excesul de aplatizare ajustat (ca pandas.Series.kurt)."""
+        n = self.n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            g2 = ((n + 1) * n * (n - 1) / ((n - 2) * (n - 3)) * self.m4 / self.m2 ** 2
+                  - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3)))
+        return np.where(n < 4, np.nan, np.where(self.m2 == 0, 0.0, g2))
+
+
+def _min_max(X):
+    """Minimul și maximul fiecărei coloane, ignorând NaN (NaN pentru coloanele fără valori)."""
+    valid = ~np.isnan(X)
+    minimum = np.min(np.where(valid, X, np.inf), axis=0, initial=np.inf)
+    maximum = np.max(np.where(valid, X, -np.inf), axis=0, initial=-np.inf)
+    empty = ~valid.any(axis=0)
+    return np.where(empty, np.nan, minimum), np.where(empty, np.nan, maximum)
+
+
+def _profile_table(columns, rows, nulls, moments, minimum, maximum, quantiles):
+    profile = pd.DataFrame({
+        'count': moments.n.astype(np.int64),
+        'mean': moments.mean,
+        'std': moments.std(),
+        'min': minimum,
+        'max': maximum,
+        'skew': moments.skew(),
+        'kurtosis': moments.kurtosis(),
+    }, index=pd.Index(columns, name='column'))
+    profile[QUANTILE_COLUMNS] = quantiles
+    # Valorile lipsă sunt raportate pentru toate coloanele, nu doar pentru cele numerice
+    profile = profile.reindex(nulls.index)
+    profile.insert(0, 'nulls', nulls.astype(np.int64))
+    profile.insert(1, 'null_pct', nulls / rows * 100 if rows else 0.0)
+    return profile
+
+
+def profile_frame(df):
+    """Profilul tuturor coloanelor din `df`, calculat vectorizat (cuartile exacte, interpolare liniară)."""
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    X = df[numeric_cols].to_numpy(dtype=np.float64)
+    minimum, maximum = _min_max(X)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # coloanele fără nicio valoare au cuartile NaN
+        quantiles = np.nanquantile(X, QUANTILES, axis=0).T if len(X) else np.full((X.shape[1], len(QUANTILES)), np.nan)
+    return _profile_table(numeric_cols, len(df), df.isna().sum(), Moments.from_array(X),
+                          minimum, maximum, quantiles)
+
+
+MAX_CACHED_PROFILES = 8
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def get_profile(df, version):
+    """
+    Profilul lui `df`, din cache dacă a mai fost calculat pentru aceeași versiune a datelor.
+    `version` identifică datele fără a le citi, ex. (data_loader.dataset_version(cale), 'completat').
+    """
+    key = (version, tuple(df.columns))
+    with _lock:
+        if key in _cache:
+            return _cache[key]
+
+    # Calculul rulează în afara lock-ului, ca alte profiluri să poată fi servite între timp
+    profile = profile_frame(df)
+    with _lock:
+        if key not in _cache:
+            if len(_cache) >= MAX_CACHED_PROFILES:
+                _cache.pop(next(iter(_cache)))  # eliminăm cea mai veche intrare
+            _cache[key] = profile
+        return _cache[key]
@@ -0,0 +1,211 @@
+"""
+Funcții comune paginilor de regresie.
+
+categorize_streams: împarte piesele în categorii de succes după numărul de streamuri (vectorizat,
+pd.cut), ca variabilă categorială ordonată "Very Low" < ... < "Very High".
+
+fit_ols / ols_inference: regresia liniară rezolvată prin descompunerea QR (coeficienți și predicții,
+ieftin la fiecare afișare); statisticile de inferență (erori standard, p-valori, diagnostice, VIF)
+se calculează separat, doar la cerere, și sunt păstrate în memorie per hash al datelor.
+
+search_logistic: căutarea hiperparametrilor (C, penalty, solver) pentru regresia logistică prin
+validare încrucișată. Joburile (o combinație solver/penalty pe un fold) rulează în paralel pe procese;
+în fiecare job valorile lui C sunt parcurse crescător cu warm_start, deci fiecare model pornește de la
+coeficienții celui anterior de pe drumul de regularizare. Rezultatele fiecărui fold sunt păstrate pe disc.
+"""
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from joblib import Memory, Parallel, delayed
+from scipy import linalg, stats
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold
+
+CACHE_DIR = "data/models/cache"
+
+# Pragurile inferioare (streamuri) ale categoriilor de succes, în ordine crescătoare
+STREAM_THRESHOLDS = (150_000_000, 300_000_000, 500_000_000, 700_000_000)
+SUCCESS_LABELS = ("Very Low", "Low", "Mid", "High", "Very High")
+
+LOGISTIC_CS = np.logspace(-3, 2, 6)
+# Combinațiile valide pentru clasificare multinomială
+LOGISTIC_CONFIGS = [
+    ("lbfgs", "l2"),
+    ("saga", "l2"),
+    ("saga", "l1"),
+]
+
+memory = Memory(CACHE_DIR, verbose=0)
+
+
+def categorize_streams(streams, thresholds=STREAM_THRESHOLDS, labels=SUCCESS_LABELS):
+    """
+    Categoria de succes a fiecărei piese: o valoare >= prag intră în categoria superioară pragului.
+    Valorile lipsă intră în prima categorie, ca în varianta inițială, deci nu apare niciun cod -1.
+    Returnează o serie categorială ordonată; `.cat.codes` dă etichetele numerice 0..len(labels)-1.
+    """
+    if len(labels) != len(thresholds) + 1:
+        raise ValueError("Numărul de etichete trebuie să fie cu unu mai mare decât numărul de praguri")
+    bins = [-np.inf, *thresholds, np.inf]
+    return pd.cut(streams.fillna(-np.inf), bins=bins, labels=list(labels), right=False, ordered=True)
+
+
+@memory.cache
+def _fit_regularization_path(X, y, train_idx, test_idx, solver, penalty, Cs, max_iter):
+    """Acuratețea pe fold-ul de test pentru fiecare C (crescător), cu warm start între valori."""
+    X_train, y_train = X[train_idx], y[train_idx]
+    X_test, y_test = X[test_idx], y[test_idx]
+    model = LogisticRegression(solver=solver, penalty=penalty, warm_start=True, max_iter=max_iter)
+    scores = []
+    for C in Cs:
+        model.set_params(C=C)
+        model.fit(X_train, y_train)
+        scores.append(model.score(X_test, y_test))
+    return scores
+
+
+def search_logistic(X, y, Cs=LOGISTIC_CS, configs=LOGISTIC_CONFIGS, cv=5, n_jobs=-1, max_iter=1000,
+                    random_state=42, confidence=0.95):
+    """
+    Validare încrucișată pentru toate combinațiile (solver, penalty, C).
+    Returnează (rezultate, cei mai buni parametri); rezultatele conțin acuratețea medie, deviația
+    standard și intervalul de încredere (t-Student) peste fold-uri, sortate descrescător.
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+    Cs = tuple(sorted(float(C) for C in Cs))
+    folds = list(StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state).split(X, y))
+
+    jobs = [(solver, penalty, fold) for solver, penalty in configs for fold in range(cv)]
+    paths = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_regularization_path)(X, y, folds[fold][0], folds[fold][1], solver, penalty, Cs, max_iter)
+        for solver, penalty, fold in jobs
+    )
+
+    rows = []
+    for (solver, penalty, fold), scores in zip(jobs, paths):
+        for C, score in zip(Cs, scores):
+            rows.append({'solver': solver, 'penalty': penalty, 'C': C, 'fold': fold, 'accuracy': score})
+    fold_scores = pd.DataFrame(rows)
+
+    results = fold_scores.groupby(['solver', 'penalty', 'C'])['accuracy'].agg(['mean', 'std', 'count']).reset_index()
+    t_value = stats.t.ppf((1 + confidence) / 2, df=cv - 1)
+    margin = t_value * results['std'] / np.sqrt(results['count'])
+    results['ci_low'] = results['mean'] - margin
+    results['ci_high'] = results['mean'] + margin
+    results = results.drop(columns='count').sort_values('mean', ascending=False).reset_index(drop=True)
+
+    best = results.iloc[0]
+    best_params = {'solver': best['solver'], 'penalty': best['penalty'], 'C': float(best['C'])}
+    return results, best_params
+
+
+@dataclass
+class OLSFit:
+    """Coeficienții unei regresii liniare cu intercept (doar ce trebuie pentru predicție)."""
+    params: np.ndarray  # [intercept, coeficienți...]
+    names: list
+
+    @property
+    def intercept(self):
+        return self.params[0]
+
+    @property
+    def coef(self):
+        return self.params[1:]
+
+    def predict(self, X):
+        """Predicții pentru o matrice de caracteristici fără coloana constantă."""
+        return np.asarray(X, dtype=np.float64) @ self.coef + self.intercept
+
+
+def _design(X):
+    return np.column_stack([np.ones(len(X)), np.asarray(X, dtype=np.float64)])
+
+
+def fit_ols(X, y, names=None):
+    """Regresie liniară prin QR: R·β = Qᵀ·y. Pentru o matrice de rang incomplet se folosește lstsq."""
+    design = _design(X)
+    y = np.asarray(y, dtype=np.float64)
+    Q, R = np.linalg.qr(design)
+    diagonal = np.abs(np.diag(R))
+    if diagonal.min() > diagonal.max() * 1e-10:
+        params = linalg.solve_triangular(R, Q.T @ y)
+    else:
+        params = np.linalg.lstsq(design, y, rcond=None)[0]
+    names = ['const'] + list(names if names is not None else [f"x{i + 1}" for i in range(design.shape[1] - 1)])
+    return OLSFit(params, names)
+
+
+def variance_inflation_factors(X):
+    """VIF pentru fiecare coloană: diagonala inversei matricei de corelație."""
+    corr = np.corrcoef(np.asarray(X, dtype=np.float64), rowvar=False)
+    return np.diag(np.linalg.pinv(corr))
+
+
+def _ols_inference(fit, X, y):
+    design = _design(X)
+    y = np.asarray(y, dtype=np.float64)
+    n, p = design.shape
+    residuals = y - design @ fit.params
+    rss = float(residuals @ residuals)
+    df_resid = n - p
+    sigma2 = rss / df_resid
+
+    # (XᵀX)⁻¹ = R⁻¹·R⁻ᵀ, fără a forma și inversa XᵀX
+    R = np.linalg.qr(design, mode='r')
+    R_inv = linalg.solve_triangular(R, np.eye(p))
+    std_err = np.sqrt(sigma2 * np.einsum('ij,ij->i', R_inv, R_inv))
+    t_values = fit.params / std_err
+    p_values = 2 * stats.t.sf(np.abs(t_values), df_resid)
+    t_critical = stats.t.ppf(0.975, df_resid)
+
+    coefficients = pd.DataFrame({
+        'coef': fit.params,
+        'std_err': std_err,
+        't': t_values,
+        'p_value': p_values,
+        'ci_low': fit.params - t_critical * std_err,
+        'ci_high': fit.params + t_critical * std_err,
+        'vif': np.r_[np.nan, variance_inflation_factors(design[:, 1:])],
+    }, index=fit.names)
+
+    tss = float(((y - y.mean()) ** 2).sum())
+    r2 = 1 - rss / tss
+    f_stat = ((tss - rss) / (p - 1)) / sigma2
+    jb_stat, jb_p = stats.jarque_bera(residuals)
+    diagnostics = {
+        'n': n,
+        'r2': r2,
+        'adj_r2': 1 - (1 - r2) * (n - 1) / df_resid,
+        'f_stat': f_stat,
+        'f_p_value': float(stats.f.sf(f_stat, p - 1, df_resid)),
+        'durbin_watson': float((np.diff(residuals) ** 2).sum() / rss),
+        'jarque_bera': float(jb_stat),
+        'jarque_bera_p_value': float(jb_p),
+        'skew': float(stats.skew(residuals)),
+        'kurtosis': float(stats.kurtosis(residuals, fisher=False)),
+        'condition_number': float(np.linalg.cond(design)),
+    }
+    return coefficients, diagnostics
+
+
+MAX_CACHED_INFERENCE = 8
+
+_inference_cache = {}
+_inference_lock = threading.Lock()
+
+
+def ols_inference(fit, X, y, data_hash):
+    """
+    Statisticile de inferență pentru `fit`, antrenat pe (X, y): (tabelul coeficienților cu p-valori
+    și VIF, diagnostice). Calculate o singură dată per hash al datelor.
+    """
+    with _inference_lock:
+        if data_hash not in _inference_cache:
+            if len(_inference_cache) >= MAX_CACHED_INFERENCE:
+                _inference_cache.pop(next(iter(_inference_cache)))  # eliminăm cea mai veche intrare
+            _inference_cache[data_hash] = _ols_inference(fit, X, y)
+        return _inference_cache[data_hash]
@@ -0,0 +1,263 @@
+"""
+Statistici de grup aproximative (sketch-uri) pentru seturi de date prea mari pentru a fi grupate în memorie.
+
+Pentru fiecare variabilă categorică și fiecare grup se construiesc, într-o singură trecere pe bucăți:
+  - momentele (count, medie, M2, min, max), combinate exact între bucăți (Chan et al.);
+  - un sketch KLL pentru cuantile (mediană), cu eroare de rang ε ≈ 2.296 / k^0.9723 (~1.3% pentru k=200);
+  - un HyperLogLog pentru numărul de valori distincte, cu eroare relativă standard 1.04 / √(2^p) (~3.3% pentru p=10).
+Memoria fiecărui sketch nu depinde de numărul de rânduri. Sketch-urile unei variabile categorice se
+construiesc doar când variabila e selectată și se salvează într-un fișier propriu, per versiune a
+fișierului de date. Variabilele cu prea multe grupuri (ex. track_name, aproape unic per rând) nu sunt
+schițate: memoria ar crește cu numărul de rânduri, deci pentru ele se folosește agregarea exactă.
+"""
+import hashlib
+import math
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from data_loader import ARTIFACTS_DIR, dataset_version, iter_chunks
+
+SKETCHES_DIR = os.path.join(ARTIFACTS_DIR, "sketches")
+KLL_K = 200
+HLL_PRECISION = 10
+APPROX_FUNCS = ['mean', 'std', 'min', 'max', 'median', 'count', 'nunique']
+MAX_SKETCH_GROUPS = 1_000  # numărul maxim de grupuri pentru care se construiesc sketch-uri
+MAX_UNIQUE_RATIO = 0.5  # variabilele cu mai multe valori distincte / rând (în eșantion) nu sunt schițate
+
+
+class TooManyGroupsError(ValueError):
+    """Variabila categorică are mai mult de MAX_SKETCH_GROUPS grupuri."""
+
+
+def kll_rank_error(k=KLL_K):
+    """Eroarea de rang normalizată a unei cuantile KLL (valori empirice, cu probabilitate ~99%)."""
+    return 2.296 / k ** 0.9723
+
+
+def hll_relative_error(p=HLL_PRECISION):
+    """Eroarea relativă standard a estimării HyperLogLog cu 2^p registre."""
+    return 1.04 / math.sqrt(1 << p)
+
+
+class KLLSketch:
+    """Sketch KLL pentru cuantile: niveluri de compactoare, fiecare element de pe nivelul h are greutatea 2^h."""
+
+    def __init__(self, k=KLL_K, seed=None):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                buffer = np.sort(self.levels[level])
+                # un element rămâne pe nivel dacă numărul lor e impar; din restul se păstrează jumătate
+                self.levels[level] = buffer[-1:] if len(buffer) % 2 else np.empty(0)
+                buffer = buffer[:len(buffer) - len(buffer) % 2]
+                offset = self._rng.integers(2)
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], buffer[offset::2]])
+            level += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.n += len(values)
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, values in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], values])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        if self.n == 0:
+            return np.nan
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(v), 2.0 ** level) for level, v in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        position = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        return float(values[order][min(position, len(values) - 1)])
+
+
+def _bit_length(x):
+    """Numărul de biți al fiecărui element dintr-un array uint64 (căutare binară vectorizată)."""
+    x = x.copy()
+    length = np.zeros(len(x), dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        high = x >= (np.uint64(1) << np.uint64(shift))
+        length += shift * high
+        x[high] >>= np.uint64(shift)
+    return length + (x > 0)
+
+
+class HyperLogLog:
+    """Estimator HyperLogLog al numărului de valori distincte, cu 2^p registre."""
+
+    def __init__(self, p=HLL_PRECISION):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def update_hashes(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        tail_bits = 64 - self.p
+        index = (hashes >> np.uint64(tail_bits)).astype(np.int64)
+        tail = hashes & np.uint64((1 << tail_bits) - 1)
+        rank = (tail_bits - _bit_length(tail) + 1).astype(np.uint8)  # poziția primului bit 1
+        np.maximum.at(self.registers, index, rank)
+        return self
+
+    def update(self, values):
+        return self.update_hashes(pd.util.hash_array(np.asarray(values)))
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(2.0 ** -self.registers.astype(np.float64))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # corecția pentru valori mici (linear counting)
+        return float(estimate)
+
+
+class GroupSketches:
+    """Momentele și sketch-urile tuturor grupurilor unei variabile categorice."""
+
+    def __init__(self, column, numeric_cols, k=KLL_K, p=HLL_PRECISION, max_groups=MAX_SKETCH_GROUPS):
+        self.column = column
+        self.numeric_cols = list(numeric_cols)
+        self.k = k
+        self.p = p
+        self.max_groups = max_groups
+        self.moments = None  # DataFrame cu coloane MultiIndex (coloană, count/mean/m2/min/max)
+        self.quantiles = {}  # (grup, coloană) -> KLLSketch
+        self.distinct = {}  # (grup, coloană) -> HyperLogLog
+
+    def _merge_moments(self, chunk_moments):
+        if self.moments is None:
+            self.moments = chunk_moments
+            return
+        a, b = self.moments.align(chunk_moments, join='outer', axis=0)
+        result = {}
+        for col in self.numeric_cols:
+            n_a, n_b = a[(col, 'count')].fillna(0), b[(col, 'count')].fillna(0)
+            mean_a, mean_b = a[(col, 'mean')].fillna(0), b[(col, 'mean')].fillna(0)
+            n = n_a + n_b
+            delta = mean_b - mean_a
+            safe_n = n.where(n > 0)
+            result[(col, 'count')] = n
+            result[(col, 'mean')] = mean_a + delta * n_b / safe_n
+            result[(col, 'm2')] = (a[(col, 'm2')].fillna(0) + b[(col, 'm2')].fillna(0)
+                                   + delta ** 2 * n_a * n_b / safe_n)
+            result[(col, 'min')] = np.fmin(a[(col, 'min')], b[(col, 'min')])
+            result[(col, 'max')] = np.fmax(a[(col, 'max')], b[(col, 'max')])
+        self.moments = pd.DataFrame(result)
+
+    def update(self, chunk):
+        values = chunk[self.numeric_cols].astype(np.float64)
+        grouped = values.groupby(chunk[self.column], observed=True)
+        stats = grouped.agg(['count', 'mean', 'var', 'min', 'max'])
+        for col in self.numeric_cols:
+            stats[(col, 'm2')] = stats[(col, 'var')].fillna(0) * (stats[(col, 'count')] - 1).clip(lower=0)
+        self._merge_moments(stats.drop(columns=[(col, 'var') for col in self.numeric_cols]))
+        if len(self.moments) > self.max_groups:
+            raise TooManyGroupsError(f"'{self.column}' are peste {self.max_groups} grupuri")
+
+        # Rândurile sortate după grup: fiecare grup devine o felie contiguă, fără indexare per grup
+        codes, groups = pd.factorize(chunk[self.column], sort=True)
+        order = np.argsort(codes, kind='stable')
+        order = order[codes[order] >= 0]  # rândurile fără grup (NaN) sunt ignorate, ca la groupby
+        boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+        present = groups[codes[order][np.r_[0, boundaries]]] if len(order) else []
+        for col in self.numeric_cols:
+            column_values = values[col].to_numpy()[order]
+            valid = ~np.isnan(column_values)
+            hashes = pd.util.hash_array(column_values)
+            slices = zip(present, np.split(column_values, boundaries), np.split(hashes, boundaries),
+                         np.split(valid, boundaries))
+            for group, group_values, group_hashes, group_valid in slices:
+                key = (group, col)
+                if key not in self.quantiles:
+                    self.quantiles[key] = KLLSketch(self.k, seed=len(self.quantiles))
+                    self.distinct[key] = HyperLogLog(self.p)
+                self.quantiles[key].update(group_values[group_valid])
+                self.distinct[key].update_hashes(group_hashes[group_valid])
+
+    def aggregate(self, cols, funcs):
+        """Echivalentul aproximativ al lui df.groupby(column)[cols].agg(funcs)."""
+        groups = self.moments.index
+        columns = {}
+        for col in cols:
+            for func in funcs:
+                if func == 'median':
+                    values = [self.quantiles[(g, col)].quantile(0.5) for g in groups]
+                elif func == 'nunique':
+                    values = [round(self.distinct[(g, col)].count()) for g in groups]
+                elif func == 'std':
+                    count = self.moments[(col, 'count')]
+                    values = np.sqrt(self.moments[(col, 'm2')] / (count - 1).where(count > 1))
+                else:
+                    values = self.moments[(col, func)]
+                columns[(col, func)] = pd.Series(np.asarray(values), index=groups)
+        result = pd.DataFrame(columns)
+        if 'count' in funcs:
+            for col in cols:
+                result[(col, 'count')] = result[(col, 'count')].astype('int64')
+        result.index.name = self.column
+        return result.sort_index()
+
+
+def sketchable_columns(sample, categorical_cols, max_unique_ratio=MAX_UNIQUE_RATIO, max_groups=MAX_SKETCH_GROUPS):
+    """Variabilele categorice cu puține grupuri (după un eșantion), pentru care sketch-urile au memorie mărginită."""
+    n = max(len(sample), 1)
+    return [col for col in categorical_cols
+            if sample[col].nunique() <= min(max_unique_ratio * n, max_groups)]
+
+
+def build_sketches(chunks, column, numeric_cols, k=KLL_K, p=HLL_PRECISION, max_groups=MAX_SKETCH_GROUPS):
+    """Sketch-urile grupurilor variabilei `column`, într-o singură trecere peste bucățile de date."""
+    sketches = GroupSketches(column, numeric_cols, k, p, max_groups)
+    for chunk in chunks:
+        sketches.update(chunk)
+    return sketches
+
+
+def load_or_build_sketches(csv_path, column, numeric_cols, chunksize=100_000, sketches_dir=SKETCHES_DIR):
+    """
+    Sketch-urile variabilei `column` pentru fișierul dat, de pe disc dacă au fost deja construite pentru
+    această versiune a lui. Fiecare variabilă are fișierul ei, deci se citesc doar coloanele ei.
+    Ridică TooManyGroupsError dacă variabila are prea multe grupuri.
+    """
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    columns_hash = hashlib.sha256("|".join([column, *numeric_cols]).encode("utf-8")).hexdigest()[:8]
+    path = os.path.join(sketches_dir, f"{name}_{dataset_version(csv_path)}_{columns_hash}.joblib")
+    if os.path.exists(path):
+        return joblib.load(path)
+
+    chunks = iter_chunks(csv_path, [column] + list(numeric_cols), chunksize)
+    sketches = build_sketches(chunks, column, numeric_cols)
+    os.makedirs(sketches_dir, exist_ok=True)
+    joblib.dump(sketches, path)
+    return sketches
@@ -0,0 +1,306 @@
+"""
+Client pentru API-ul Spotify folosit la îmbogățirea datelor cu genul și țara artiștilor.
+
+- cererile rulează în paralel pe un număr limitat de fire de execuție;
+- un token bucket limitează rata cererilor și respectă header-ul Retry-After (HTTP 429);
+- tokenul de acces se reînnoiește automat la expirare sau la un răspuns 401;
+- rezultatele se păstrează pe disc (cu TTL), deci o nouă rulare interoghează doar artiștii noi;
+- numele artiștilor se rezolvă o singură dată în ID-uri Spotify (mapare păstrată pe disc),
+  iar detaliile se cer apoi în loturi de câte 50 de ID-uri (endpoint-ul "several artists").
+
+URL-urile API-ului sunt configurabile, astfel încât clientul poate fi rulat și
+împotriva unui server HTTP local care imită Spotify.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+TOKEN_URL = "https://accounts.spotify.com/api/token"
+API_URL = "https://api.spotify.com/v1"
+MAX_IDS_PER_REQUEST = 50  # limita endpoint-ului /artists?ids=...
+
+
+def _backoff(attempt):
+    return min(2 ** attempt, 30)
+
+
+def parse_retry_after(value, default):
+    """Secundele de așteptare din header-ul Retry-After: un număr de secunde sau o dată HTTP."""
+    if value is None:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when is None:
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class TokenBucket:
+    """Limitator de rată: cel mult `rate` cereri pe secundă, cu rafale de până la `capacity`."""
+
+    def __init__(self, rate=5.0, capacity=5):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def block_for(self, seconds):
+        """Oprește toate cererile pentru `seconds` secunde (ex. după un Retry-After)."""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+
+class SpotifyClient:
+    def __init__(self, client_id, client_secret, token_url=TOKEN_URL, api_url=API_URL,
+                 rate=5.0, max_retries=5, timeout=10):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.token_url = token_url
+        self.api_url = api_url.rstrip("/")
+        self.bucket = TokenBucket(rate=rate, capacity=max(1, int(rate)))
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._token = None
+        self._token_expires = 0.0
+        self._token_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _session(self):
+        # Câte o sesiune HTTP per fir de execuție (requests.Session nu e thread-safe)
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def _refresh_token(self, stale_token=None):
+        with self._token_lock:
+            # Alt fir a reînnoit deja tokenul între timp
+            if self._token and self._token != stale_token and time.time() < self._token_expires:
+                return self._token
+            response = self._session().post(
+                self.token_url,
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+                data={"grant_type": "client_credentials",
+                      "client_id": self.client_id,
+                      "client_secret": self.client_secret},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            payload = response.json()
+            self._token = payload["access_token"]
+            # Reînnoim cu un minut înainte de expirarea reală
+            self._token_expires = time.time() + payload.get("expires_in", 3600) - 60
+            return self._token
+
+    def token(self):
+        if self._token is None or time.time() >= self._token_expires:
+            return self._refresh_token(self._token)
+        return self._token
+
+    def get(self, path, params=None):
+        """GET pe API, cu limitare de rată, reîncercări la 429/5xx și reînnoirea tokenului la 401."""
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            token = self.token()
+            response = self._session().get(
+                f"{self.api_url}/{path.lstrip('/')}",
+                params=params,
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=self.timeout,
+            )
+            if response.status_code == 401:
+                self._refresh_token(token)
+                continue
+            if response.status_code == 429:
+                self.bucket.block_for(parse_retry_after(response.headers.get("Retry-After"), _backoff(attempt)))
+                continue
+            if response.status_code >= 500 and attempt < self.max_retries:
+                time.sleep(_backoff(attempt))
+                continue
+            response.raise_for_status()
+            return response.json()
+        raise RuntimeError(f"Cererea către '{path}' a eșuat după {self.max_retries} reîncercări")
+
+    def resolve_artist_id(self, artist_name):
+        """Caută artistul după nume și returnează ID-ul Spotify (sau None)."""
+        data = self.get("search", params={"q": artist_name, "type": "artist", "limit": 1})
+        items = data.get("artists", {}).get("items", [])
+        return items[0]["id"] if items else None
+
+    def get_several_artists(self, artist_ids):
+        """Detaliile a până la 50 de artiști într-o singură cerere."""
+        if len(artist_ids) > MAX_IDS_PER_REQUEST:
+            raise ValueError(f"Cel mult {MAX_IDS_PER_REQUEST} ID-uri per cerere")
+        data = self.get("artists", params={"ids": ",".join(artist_ids)})
+        return [artist for artist in data.get("artists", []) if artist]
+
+    def get_artist_info(self, artist_name):
+        """Caută artistul după nume și returnează (genuri, țară)."""
+        data = self.get("search", params={"q": artist_name, "type": "artist", "limit": 1})
+        items = data.get("artists", {}).get("items", [])
+        if items:
+            artist = items[0]
+            return artist.get("genres", []), artist.get("country", "Unknown")
+        return [], "Unknown"
+
+
+class JsonStore:
+    """Dicționar păstrat pe disc ca JSON; scrierea e atomică (fișier temporar + os.replace)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def save(self):
+        with self.lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+
+class ArtistIdCache(JsonStore):
+    """
+    Maparea nume artist -> ID Spotify. ID-urile sunt stabile, deci nu expiră; numele negăsite la căutare
+    sunt păstrate doar `negative_ttl` secunde, apoi se caută din nou.
+    """
+
+    def __init__(self, path="data/artist_ids.json", negative_ttl=7 * 24 * 3600):
+        super().__init__(path)
+        self.negative_ttl = negative_ttl
+
+    def __contains__(self, artist_name):
+        entry = self.entries.get(artist_name)
+        if isinstance(entry, dict):
+            return time.time() - entry["checked_at"] <= self.negative_ttl
+        return entry is not None  # intrările vechi None (fără dată) sunt considerate expirate
+
+    def get(self, artist_name):
+        entry = self.entries.get(artist_name)
+        return entry if isinstance(entry, str) else None
+
+    def set(self, artist_name, artist_id):
+        with self.lock:
+            if artist_id is None:
+                self.entries[artist_name] = {"id": None, "checked_at": time.time()}
+            else:
+                self.entries[artist_name] = artist_id
+
+
+class ArtistCache(JsonStore):
+    """Cache pe disc (JSON) artist -> {genres, country}, cu expirare după `ttl` secunde."""
+
+    def __init__(self, path="data/artist_cache.json", ttl=30 * 24 * 3600):
+        super().__init__(path)
+        self.ttl = ttl
+
+    def get(self, artist_name):
+        entry = self.entries.get(artist_name)
+        if entry is None or time.time() - entry["fetched_at"] > self.ttl:
+            return None
+        return entry["genres"], entry["country"]
+
+    def set(self, artist_name, genres, country):
+        with self.lock:
+            self.entries[artist_name] = {"genres": genres, "country": country, "fetched_at": time.time()}
+
+
+def enrich_artists(artist_names, client, cache, max_workers=8, progress=None):
+    """
+    Returnează un dicționar artist -> (genuri, țară).
+    Doar artiștii care nu sunt în cache (sau au expirat) sunt interogați, în paralel.
+    """
+    artist_names = list(dict.fromkeys(artist_names))
+    missing = [name for name in artist_names if cache.get(name) is None]
+
+    def fetch(name):
+        genres, country = client.get_artist_info(name)
+        cache.set(name, genres, country)
+        return name
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for _ in executor.map(fetch, missing):
+                if progress is not None:
+                    progress.update(1)
+    finally:
+        # Salvăm și rezultatele parțiale, ca o rulare întreruptă să nu le piardă
+        cache.save()
+
+    return {name: cache.get(name) for name in artist_names}
+
+
+def enrich_artists_batched(artist_names, client, cache, id_cache, max_workers=8, progress=None):
+    """
+    Varianta în două faze a lui enrich_artists:
+    1. rezolvă numele noi în ID-uri Spotify (o singură dată; maparea rămâne în id_cache);
+    2. cere detaliile artiștilor lipsă din cache în loturi de câte 50 de ID-uri.
+    Artiștii fără ID (negăsiți la căutare) primesc ([], "Unknown"), fără a fi salvați în `cache`, ca să
+    fie căutați din nou după expirarea rezultatului negativ din id_cache.
+    """
+    artist_names = list(dict.fromkeys(artist_names))
+    missing = [name for name in artist_names if cache.get(name) is None]
+
+    def resolve(name):
+        id_cache.set(name, client.resolve_artist_id(name))
+
+    def fetch_batch(batch):
+        artists = {artist["id"]: artist for artist in client.get_several_artists([artist_id for _, artist_id in batch])}
+        for name, artist_id in batch:
+            artist = artists.get(artist_id, {})
+            cache.set(name, artist.get("genres", []), artist.get("country", "Unknown"))
+        return len(batch)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Faza 1: doar numele care nu au fost rezolvate niciodată
+            list(executor.map(resolve, [name for name in missing if name not in id_cache]))
+
+            unresolved = [name for name in missing if id_cache.get(name) is None]
+            if progress is not None:
+                progress.update(len(unresolved))
+
+            # Faza 2: loturi de câte MAX_IDS_PER_REQUEST ID-uri
+            pending = [(name, id_cache.get(name)) for name in missing if id_cache.get(name) is not None]
+            batches = [pending[i:i + MAX_IDS_PER_REQUEST] for i in range(0, len(pending), MAX_IDS_PER_REQUEST)]
+            for done in executor.map(fetch_batch, batches):
+                if progress is not None:
+                    progress.update(done)
+    finally:
+        id_cache.save()
+        cache.save()
+
+    return {name: cache.get(name) or ([], "Unknown") for name in artist_names}